@@ -0,0 +1,80 @@
+import os
+import zlib
+import hashlib
+from typing import Iterable, Iterator, TypedDict
+
+# Directory where compressed raw notes are stored, one file per content hash
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", ".blobs")
+
+
+class BlobRef(TypedDict):
+    """
+    Reference to a blob kept in graph state instead of the blob itself.
+    """
+
+    id: str
+    size: int
+
+
+def _blob_path(blob_id: str) -> str:
+    """Shard blobs by the first two characters of their hash to keep directories small."""
+    return os.path.join(BLOB_STORE_DIR, blob_id[:2], blob_id)
+
+
+def put_blob(content: str) -> BlobRef:
+    """
+    Write text to the content-addressed blob store.
+
+    Identical content always maps to the same id, so writing the same notes twice
+    is a no-op on disk.
+
+    Args:
+        content: Text to store
+
+    Returns:
+        Reference holding the blob id and the uncompressed size in bytes
+    """
+    data = content.encode("utf-8")
+    blob_id = hashlib.sha256(data).hexdigest()
+    path = _blob_path(blob_id)
+
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see a partial blob
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(zlib.compress(data))
+        os.replace(tmp_path, path)
+
+    return {"id": blob_id, "size": len(data)}
+
+
+def get_blob(blob_id: str) -> str:
+    """
+    Read a blob back from the store.
+
+    Args:
+        blob_id: Id returned by put_blob
+
+    Returns:
+        The original text
+    """
+    with open(_blob_path(blob_id), "rb") as f:
+        return zlib.decompress(f.read()).decode("utf-8")
+
+
+def load_blobs(refs: Iterable[BlobRef]) -> Iterator[str]:
+    """
+    Lazily load the content behind a list of blob references.
+
+    Blobs are read one at a time as the iterator is consumed, so callers that only
+    need part of the notes never hold all of them in memory.
+
+    Args:
+        refs: Blob references as kept in graph state
+
+    Returns:
+        Iterator over the stored texts, in the order of the references
+    """
+    for ref in refs:
+        yield get_blob(ref["id"])
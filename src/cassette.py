@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import importlib
+import threading
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List
+
+from pydantic import BaseModel
+from langchain_core.load import dumpd, load
+from langchain_core.load.serializable import Serializable
+
+from src.metrics import increment
+
+# "record" captures every chat model and Tavily call of a run into the cassette,
+# "replay" serves them back from it without any network access, "off" disables both
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off")
+
+CASSETTE_PATH = os.getenv("CASSETTE_PATH", ".cache/cassette.jsonl")
+
+# Replayed calls take their recorded latency multiplied by this factor, 0 replays instantly
+CASSETTE_LATENCY_SCALE = float(os.getenv("CASSETTE_LATENCY_SCALE", "1.0"))
+
+
+class CassetteMissError(Exception):
+    """Raised in replay mode for a call that has no recording left in the cassette."""
+
+
+def _encode(value: Any) -> Any:
+    """Turn messages, structured outputs and containers of them into JSON-compatible data."""
+    if isinstance(value, Serializable):
+        return {"__lc__": dumpd(value)}
+    if isinstance(value, BaseModel):
+        cls = type(value)
+        return {"__pydantic__": f"{cls.__module__}:{cls.__qualname__}", "data": value.model_dump()}
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    return value
+
+
+def _decode(value: Any) -> Any:
+    """Inverse of _encode."""
+    if isinstance(value, dict):
+        if "__lc__" in value:
+            return load(value["__lc__"])
+        if "__pydantic__" in value:
+            module, qualname = value["__pydantic__"].split(":")
+            cls = importlib.import_module(module)
+            for part in qualname.split("."):
+                cls = getattr(cls, part)
+            return cls.model_validate(value["data"])
+        return {key: _decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+def _strip_ids(value: Any) -> Any:
+    """Drop message and run ids, which are random for every run, from encoded data."""
+    if isinstance(value, dict):
+        return {key: _strip_ids(item) for key, item in value.items() if key not in ("id", "run_id")}
+    if isinstance(value, list):
+        return [_strip_ids(item) for item in value]
+    return value
+
+
+def request_key(kind: str, name: str, request: Any) -> str:
+    """Stable hash identifying a call by its kind, name and request content."""
+    canonical = json.dumps(_strip_ids(_encode(request)), sort_keys=True, default=str)
+    return hashlib.sha256(f"{kind}:{name}:{canonical}".encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """
+    Recorded calls of a run, stored one JSON object per line.
+
+    Replay serves the first unused recording with the same request, or when the request changed
+    (e.g. the date in a prompt) the next unused recording of the same call site in recorded order.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._started_recording = False
+        self._by_key: Dict[str, List[Dict]] = defaultdict(list)
+        self._by_site: Dict[str, List[Dict]] = defaultdict(list)
+        self._loaded = False
+
+    def record(self, kind: str, name: str, request: Any, response: Any, latency: float) -> None:
+        """Append a call to the cassette, starting a new file on the first call of the process."""
+        entry = {
+            "kind": kind,
+            "name": name,
+            "key": request_key(kind, name, request),
+            "latency": latency,
+            "response": _encode(response),
+        }
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            mode = "a" if self._started_recording else "w"
+            self._started_recording = True
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, mode, encoding="utf-8") as f:
+                f.write(line + "\n")
+        increment("cassette.recorded")
+
+    def _load(self) -> None:
+        """Index the recorded calls by request key and by call site."""
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                entry["used"] = False
+                self._by_key[entry["key"]].append(entry)
+                self._by_site[f"{entry['kind']}:{entry['name']}"].append(entry)
+        self._loaded = True
+
+    def next_recording(self, kind: str, name: str, request: Any) -> Dict:
+        """Take the recording serving a call in replay mode."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            for entry in self._by_key[request_key(kind, name, request)]:
+                if not entry["used"]:
+                    entry["used"] = True
+                    increment("cassette.replayed")
+                    return entry
+            for entry in self._by_site[f"{kind}:{name}"]:
+                if not entry["used"]:
+                    entry["used"] = True
+                    increment("cassette.replayed")
+                    increment("cassette.order_fallbacks")
+                    return entry
+        increment("cassette.misses")
+        raise CassetteMissError(f"No recording left for {kind} call '{name}' in {self.path}")
+
+
+_cassette = Cassette(CASSETTE_PATH)
+
+
+async def through_cassette(
+    kind: str, name: str, request: Any, call: Callable[[], Awaitable[Any]]
+) -> Any:
+    """
+    Run a chat model or search call through the cassette.
+
+    Args:
+        kind: Kind of call, "llm" or "search"
+        name: Call site, e.g. the model name or the API path
+        request: Request content used to match recordings
+        call: Coroutine function making the real call
+
+    Returns:
+        The real response, or the recorded one in replay mode
+    """
+    if CASSETTE_MODE == "replay":
+        entry = _cassette.next_recording(kind, name, request)
+        await asyncio.sleep(entry["latency"] * CASSETTE_LATENCY_SCALE)
+        return _decode(entry["response"])
+
+    if CASSETTE_MODE != "record":
+        return await call()
+
+    start = time.monotonic()
+    response = await call()
+    _cassette.record(kind, name, request, response, time.monotonic() - start)
+    return response
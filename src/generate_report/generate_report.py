@@ -1,10 +1,16 @@
+import asyncio
 from src.state import AgentState
 from src.generate_report.prompt import FINAL_REPORT_GENERATION_PROMPT
 from src.utils import get_today_str
+from src.sources import expand_source_ids
+from src.llm import resilient
+from src.run_cache import RUN_CACHE_ENABLED, store_run
 from langchain.chat_models import init_chat_model
 from langchain_core.messages import HumanMessage
 
-writer_model = init_chat_model(model="openai:gpt-5-nano")
+writer_model = resilient(
+    init_chat_model(model="openai:gpt-5-nano"), name="generate_report", timeout=600
+)
 
 
 async def generate_report(state: AgentState):
@@ -22,11 +28,31 @@ async def generate_report(state: AgentState):
         findings=findings,
     )
     
-    final_report = await writer_model.ainvoke([HumanMessage(content=system_instruction)])
-    
+    response = await writer_model.ainvoke([HumanMessage(content=system_instruction)])
+
+    # Turn the compact source ids into numbered citations and the source list
+    final_report = expand_source_ids(response.content, state.get("sources", {}))
+
+    # Remember fresh research so repeated briefs can skip it, cached research keeps its original age
+    if RUN_CACHE_ENABLED and not state.get("run_cache_hit"):
+        await asyncio.to_thread(
+            store_run,
+            research_brief,
+            {
+                "notes": notes,
+                "raw_notes": state.get("raw_notes", []),
+                "sources": state.get("sources", {}),
+                "final_report": final_report,
+                "report_with_source_ids": response.content,
+            },
+        )
+
     return {
-        "final_report": final_report.content,
-        "messages": ["Here is the final report: " + final_report.content],
+        "final_report": final_report,
+        "report_with_source_ids": response.content,
+        # force_refresh only applies to the turn that set it
+        "force_refresh": False,
+        "messages": ["Here is the final report: " + final_report],
     }
     
     
@@ -19,9 +19,9 @@ Here are the findings from the research that you conducted:
 Please create a detailed answer to the overall research brief that:
 1. Is well-organized with proper headings (# for title, ## for sections, ### for subsections)
 2. Includes specific facts and insights from the research
-3. References relevant sources using [Title](URL) format
+3. References relevant sources by their source id, e.g. [S3f9a2c]
 4. Provides a balanced, thorough analysis. Be as comprehensive as possible, and include all information that is relevant to the overall research question. People are using you for deep research and will expect detailed, comprehensive answers.
-5. Includes a "Sources" section at the end with all referenced links
+5. Does NOT include a "Sources" section, the numbered source list is appended automatically from the ids you cite
 
 You can structure your report in a number of different ways. Here are some examples:
 
@@ -67,13 +67,43 @@ Make sure the final answer report is in the SAME language as the human messages
 Format the report in clear markdown with proper structure and include source references where appropriate.
 
 <Citation Rules>
-- Assign each unique URL a single citation number in your text
-- End with ### Sources that lists each source with corresponding numbers
-- IMPORTANT: Number sources sequentially without gaps (1,2,3,4...) in the final list regardless of which sources you choose
-- Each source should be a separate line item in a list, so that in markdown it is rendered as a list.
-- Example format:
-  [1] Source Title: URL
-  [2] Source Title: URL
+- The findings cite sources with short ids such as [S3f9a2c]
+- Cite sources inline with the exact same ids in square brackets, e.g. "Sales grew 20% [S3f9a2c]" or "[S3f9a2c, S0b1d4e]"
+- Never invent ids, renumber them or write URLs yourself. The ids are turned into sequential citation numbers and a ### Sources list after you finish
 - Citations are extremely important. Make sure to include these, and pay a lot of attention to getting these right. Users will often use these citations to look into more information.
 </Citation Rules>
-"""
\ No newline at end of file
+"""
+
+REVISE_REPORT_PROMPT = """
+You wrote the research report below for this research brief:
+<Research Brief>
+{research_brief}
+</Research Brief>
+
+Today's date is {date}.
+
+<Report>
+{report}
+</Report>
+
+Here are the findings from the research, the report was written from them:
+<Findings>
+{findings}
+</Findings>
+
+The user has asked for the following change:
+<Request>
+{request}
+</Request>
+
+Rewrite the report so that it fulfils the request:
+1. Apply the requested change and keep everything else the user did not ask to change
+2. Use only facts from the report and the findings, never add facts from memory
+3. Keep citing sources by their source id, e.g. [S3f9a2c], and do NOT add a "Sources" section
+4. Write in the same language as the report unless the request asks for another one
+5. Output only the revised report, without any commentary about the changes
+{research_instructions}"""
+
+REVISE_REPORT_RESEARCH_INSTRUCTIONS = """
+If the request needs facts that are neither in the report nor in the findings, do not write the report.
+Instead reply with a single line "NEEDS_RESEARCH: " followed by a detailed, standalone description of the missing information to research."""
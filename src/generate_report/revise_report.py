@@ -0,0 +1,81 @@
+from src.state import AgentState
+from src.generate_report.prompt import (
+    REVISE_REPORT_PROMPT,
+    REVISE_REPORT_RESEARCH_INSTRUCTIONS,
+)
+from src.research_agent.agent import research_agent
+from src.utils import get_today_str
+from src.sources import expand_source_ids
+from src.metrics import increment
+from src.llm import resilient
+from langchain.chat_models import init_chat_model
+from langchain_core.messages import HumanMessage
+
+writer_model = resilient(
+    init_chat_model(model="openai:gpt-5-nano"), name="revise_report", timeout=600
+)
+
+# Reply of the writer when the revision needs facts the research did not cover
+NEEDS_RESEARCH_MARKER = "NEEDS_RESEARCH:"
+
+
+async def revise_report(state: AgentState):
+    """
+    This node revises the delivered report for a follow-up request without re-running the research phase.
+
+    Reuses the notes, research brief and report from state. When the request needs new facts,
+    a single research agent is launched on the missing information before the report is rewritten.
+    """
+    request = str(state["messages"][-1].content)
+    notes = list(state.get("notes", []))
+    sources = dict(state.get("sources", {}))
+    # Revise the version citing source ids so new citations can be numbered with the old ones
+    report = state.get("report_with_source_ids") or state.get("final_report", "")
+
+    def revision_prompt(allow_research: bool) -> str:
+        return REVISE_REPORT_PROMPT.format(
+            research_brief=state.get("research_brief", ""),
+            date=get_today_str(),
+            report=report,
+            findings="\n".join(notes),
+            request=request,
+            research_instructions=REVISE_REPORT_RESEARCH_INSTRUCTIONS if allow_research else "",
+        )
+
+    increment("revise_report.revisions")
+    response = await writer_model.ainvoke([HumanMessage(content=revision_prompt(True))])
+    revised = str(response.content).strip()
+
+    new_notes, new_raw_notes, new_sources = [], [], {}
+    if revised.startswith(NEEDS_RESEARCH_MARKER):
+        research_topic = revised[len(NEEDS_RESEARCH_MARKER):].strip()
+        print(f"Revision needs new research: {research_topic[:100]}")
+        increment("revise_report.researched")
+
+        result = await research_agent.ainvoke(
+            {
+                "researcher_messages": [HumanMessage(content=research_topic)],
+                "research_brief": research_topic,
+            }
+        )
+        new_notes = [result.get("compressed_research", "")]
+        new_raw_notes = result.get("raw_notes", [])
+        new_sources = result.get("sources", {})
+        notes += new_notes
+        sources.update(new_sources)
+
+        response = await writer_model.ainvoke([HumanMessage(content=revision_prompt(False))])
+        revised = str(response.content).strip()
+
+    final_report = expand_source_ids(revised, sources)
+
+    return {
+        "final_report": final_report,
+        "report_with_source_ids": revised,
+        "notes": new_notes,
+        "raw_notes": new_raw_notes,
+        "sources": new_sources,
+        # force_refresh only applies to the turn that set it
+        "force_refresh": False,
+        "messages": ["Here is the revised report: " + final_report],
+    }
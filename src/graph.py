@@ -2,18 +2,37 @@ from langgraph.graph import StateGraph, START, END
 from src.state import AgentState, InputState
 from src.nodes.clarify_user_request import clarify_user_request
 from src.nodes.write_research_brief import write_research_brief
+from src.nodes.scope_research import scope_research
+from src.nodes.lookup_run_cache import lookup_run_cache
 from src.supervisor.supervisor import supervisor_agent
 from src.generate_report.generate_report import generate_report
+from src.generate_report.revise_report import revise_report
+from src.nodes.route_request import route_request
+
+# Produce the clarification decision and the research brief in a single structured call
+# Set to False to use the two step clarify_user_request -> write_research_brief flow
+SCOPING_FAST_PATH = True
 
 deep_research_builder = StateGraph(AgentState, input_schema=InputState)
 
 deep_research_builder.add_node("clarify_user_request", clarify_user_request)
 deep_research_builder.add_node("write_research_brief", write_research_brief)
+deep_research_builder.add_node("scope_research", scope_research)
+deep_research_builder.add_node("lookup_run_cache", lookup_run_cache)
 deep_research_builder.add_node("research_phase", supervisor_agent)
 deep_research_builder.add_node("generate_report", generate_report)
+deep_research_builder.add_node("revise_report", revise_report)
 
-deep_research_builder.add_edge(START, "clarify_user_request")
+# Follow-ups asking to change a delivered report skip scoping and research
+deep_research_builder.add_conditional_edges(
+    START,
+    route_request,
+    {
+        "revise_report": "revise_report",
+        "scoping": "scope_research" if SCOPING_FAST_PATH else "clarify_user_request",
+    },
+)
 
 deep_research_builder.add_edge("research_phase", "generate_report")
 
-graph = deep_research_builder.compile()
\ No newline at end of file
+graph = deep_research_builder.compile()
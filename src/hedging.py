@@ -0,0 +1,71 @@
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, TypeVar
+
+from src.metrics import increment
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """
+    Rolling window of request latencies used to pick a hedge delay.
+    """
+
+    def __init__(self, default_delay: float, min_samples: int = 20, window: int = 200):
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self._latencies: deque = deque(maxlen=window)
+
+    def record(self, latency: float) -> None:
+        """Record the latency of a successful request in seconds."""
+        self._latencies.append(latency)
+
+    def p95(self) -> float:
+        """
+        p95 of the recent latencies, or the default delay when too few have been observed.
+        """
+        if len(self._latencies) < self.min_samples:
+            return self.default_delay
+        ordered = sorted(self._latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+async def hedged(
+    call: Callable[[], Awaitable[T]], delay: float, metric_prefix: str
+) -> T:
+    """
+    Run a call and, if it has not returned after the delay, race it against a duplicate.
+
+    Whichever attempt succeeds first wins and the other one is cancelled.
+    If both attempts fail, the error of the first attempt is raised.
+
+    Args:
+        call: Factory that starts a new attempt each time it is called
+        delay: Seconds to wait before firing the duplicate attempt
+        metric_prefix: Prefix of the "hedges" and "hedge_wins" counters
+
+    Returns:
+        Result of the winning attempt
+    """
+    primary = asyncio.ensure_future(call())
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result()
+
+    increment(f"{metric_prefix}.hedges")
+    hedge = asyncio.ensure_future(call())
+    pending = {primary, hedge}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        increment(f"{metric_prefix}.hedge_wins")
+                    return task.result()
+        # Both attempts failed, surface the primary error
+        return primary.result()
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,137 @@
+import time
+import random
+import asyncio
+from typing import Any, Optional
+
+import openai
+from langchain_core.runnables import Runnable
+
+from src.metrics import increment
+from src.hedging import LatencyTracker, hedged
+from src.cassette import through_cassette
+
+# Exponential backoff between retries with full jitter, capped at the max delay
+LLM_BACKOFF_BASE_SECONDS = 1.0
+LLM_BACKOFF_MAX_SECONDS = 10.0
+
+# Provider errors that are worth retrying, chat completions are idempotent so retries are safe
+TRANSIENT_ERRORS = (
+    asyncio.TimeoutError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class ResilientModel:
+    """
+    Wrapper around a chat model runnable that bounds the latency of every call.
+
+    Each call is abandoned after the node timeout and retried with jittered backoff.
+    Short calls can be hedged: when a call is slower than the observed p95 latency a
+    duplicate is fired and whichever returns first is used.
+    """
+
+    def __init__(
+        self,
+        runnable: Runnable,
+        name: str,
+        timeout: float,
+        max_retries: int = 2,
+        hedge: bool = False,
+        hedge_delay: float = 10.0,
+    ):
+        self.runnable = runnable
+        self.name = name
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.hedge = hedge
+        self._latencies = LatencyTracker(hedge_delay)
+
+    async def _attempt(self, input: Any, config: Optional[dict], **kwargs) -> Any:
+        """Run a single attempt bounded by the node timeout."""
+        start = time.monotonic()
+        response = await asyncio.wait_for(
+            self.runnable.ainvoke(input, config, **kwargs), timeout=self.timeout
+        )
+        self._latencies.record(time.monotonic() - start)
+        return response
+
+    async def ainvoke(self, input: Any, config: Optional[dict] = None, **kwargs) -> Any:
+        """
+        Invoke the wrapped runnable with timeout, retries and optional hedging.
+
+        Calls go through the record/replay cassette, see src/cassette.py.
+
+        Args:
+            input: Input passed to the wrapped runnable, usually a list of messages
+            config: Optional runnable config
+
+        Returns:
+            Response of the wrapped runnable
+        """
+        # Counted before the cassette so record and replay report the same calls,
+        # retried attempts are counted separately under retries
+        increment(f"llm.{self.name}.calls")
+        response = await through_cassette(
+            "llm", self.name, input, lambda: self._invoke(input, config, **kwargs)
+        )
+        # Token usage is reported on plain chat responses and on structured outputs that include
+        # the raw message, not on bare structured outputs
+        raw = response.get("raw") if isinstance(response, dict) else response
+        usage = getattr(raw, "usage_metadata", None)
+        if usage:
+            increment(f"llm.{self.name}.input_tokens", usage.get("input_tokens", 0))
+            increment(f"llm.{self.name}.output_tokens", usage.get("output_tokens", 0))
+        return response
+
+    async def _invoke(self, input: Any, config: Optional[dict], **kwargs) -> Any:
+        """Invoke the wrapped runnable with timeout, retries and optional hedging."""
+        metric_prefix = f"llm.{self.name}"
+        for attempt in range(self.max_retries + 1):
+            try:
+                if self.hedge:
+                    return await hedged(
+                        lambda: self._attempt(input, config, **kwargs),
+                        self._latencies.p95(),
+                        metric_prefix,
+                    )
+                return await self._attempt(input, config, **kwargs)
+            except TRANSIENT_ERRORS as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    increment(f"{metric_prefix}.timeouts")
+                if attempt == self.max_retries:
+                    raise
+                delay = random.uniform(
+                    0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2**attempt)
+                )
+                print(
+                    f"Transient error calling {self.name} model ({type(e).__name__}), "
+                    f"retrying in {delay:.1f}s"
+                )
+                increment(f"{metric_prefix}.retries")
+                await asyncio.sleep(delay)
+
+
+def resilient(
+    runnable: Runnable,
+    name: str,
+    timeout: float,
+    max_retries: int = 2,
+    hedge: bool = False,
+) -> ResilientModel:
+    """
+    Wrap a chat model (or a model bound to tools / structured output) for tail-latency control.
+
+    Args:
+        runnable: Chat model runnable to wrap
+        name: Name of the node using the model, used for the metrics
+        timeout: Seconds after which a single attempt is abandoned
+        max_retries: Number of retries after the first attempt on timeouts and transient errors
+        hedge: Whether to fire a duplicate request when the call is slower than the p95 latency
+
+    Returns:
+        ResilientModel exposing ainvoke
+    """
+    return ResilientModel(runnable, name, timeout, max_retries=max_retries, hedge=hedge)
@@ -0,0 +1,73 @@
+import sys
+import threading
+from collections import Counter
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Process wide counters used to measure the performance features of the agent
+# Nodes run on the event loop and in worker threads, so updates are guarded by a lock
+_counters: Counter = Counter()
+_lock = threading.Lock()
+
+
+def increment(name: str, value: float = 1) -> None:
+    """
+    Increment a named counter.
+
+    Args:
+        name: Dotted counter name, e.g. "prefetch.hits"
+        value: Amount to add to the counter
+    """
+    with _lock:
+        _counters[name] += value
+
+
+def get_metrics(prefix: str = "") -> dict[str, float]:
+    """
+    Get a snapshot of the counters.
+
+    Args:
+        prefix: Only return counters whose name starts with this prefix
+
+    Returns:
+        Dictionary of counter name to value
+    """
+    with _lock:
+        return {
+            name: value for name, value in _counters.items() if name.startswith(prefix)
+        }
+
+
+def ratio(numerator: str, denominator: str) -> float:
+    """
+    Ratio between two counters, 0.0 when the denominator has not been recorded yet.
+    """
+    with _lock:
+        total = _counters[denominator]
+        return _counters[numerator] / total if total else 0.0
+
+
+def record_peak_rss() -> None:
+    """
+    Record the peak resident set size of the process as the "memory.peak_rss_bytes" gauge.
+
+    Unlike the counters, the gauge is overwritten with the operating system's peak for the
+    whole process lifetime, which a metrics reset does not clear.
+    """
+    if resource is None:
+        return
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    if sys.platform != "darwin":
+        peak *= 1024
+    with _lock:
+        _counters["memory.peak_rss_bytes"] = max(_counters["memory.peak_rss_bytes"], peak)
+
+
+def reset_metrics() -> None:
+    """Reset all counters, e.g. between benchmark runs."""
+    with _lock:
+        _counters.clear()
@@ -5,11 +5,17 @@ from src.schema import ClarifyUserRequest
 from langchain_core.messages import get_buffer_string,AIMessage
 from langchain.chat_models import init_chat_model
 from src.utils import get_today_str
+from src.llm import resilient
 from langgraph.graph import END
 
 # Initialize the LLM and the structured LLM
 llm = init_chat_model(model="gpt-4o-mini", temperature=0)
-structured_llm = llm.with_structured_output(ClarifyUserRequest)
+structured_llm = resilient(
+    llm.with_structured_output(ClarifyUserRequest),
+    name="clarify_user_request",
+    timeout=30,
+    hedge=True,
+)
 
 
 # System instruction
@@ -60,7 +66,7 @@ Today's date is {date}.
 """
 
 # Node function
-def clarify_user_request(
+async def clarify_user_request(
     state: AgentState,
 ) -> Command[Literal[END, "write_research_brief"]]:
     """
@@ -86,7 +92,7 @@ def clarify_user_request(
         }
     ]
     
-    response = structured_llm.invoke(messages)
+    response = await structured_llm.ainvoke(messages)
     
     if response.need_clarification:
         return Command(
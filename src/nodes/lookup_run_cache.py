@@ -0,0 +1,63 @@
+import asyncio
+from langgraph.types import Command
+from typing import Literal
+from src.state import AgentState, override
+from langgraph.graph import END
+from src.run_cache import RUN_CACHE_ENABLED, RUN_CACHE_REUSE_REPORT, find_run
+
+
+# Node function
+async def lookup_run_cache(
+    state: AgentState,
+) -> Command[Literal["research_phase", "generate_report", END]]:
+    """
+    Serve a repeated research brief from an earlier run.
+
+    If a fresh run with the same brief is cached, either return its final report right away
+    or skip the research phase and rewrite the report from its notes.
+    Otherwise, or when the request sets force_refresh, route to the research phase.
+    run_cache_hit is written on every pass so a hit of an earlier turn never carries over.
+    notes, raw_notes and sources are replaced rather than added to, so each turn only
+    reports, and stores in the run cache, its own research.
+    """
+    # Research of earlier turns in the thread is dropped before this turn starts
+    fresh_research = {
+        "notes": override([]),
+        "raw_notes": override([]),
+        "sources": override({}),
+        "run_cache_hit": False,
+    }
+
+    if not RUN_CACHE_ENABLED or state.get("force_refresh"):
+        return Command(goto="research_phase", update=fresh_research)
+
+    cached = await asyncio.to_thread(find_run, state["research_brief"])
+
+    if cached is None:
+        return Command(goto="research_phase", update=fresh_research)
+
+    if RUN_CACHE_REUSE_REPORT and cached.get("final_report"):
+        return Command(
+            goto=END,
+            update={
+                "notes": override(cached["notes"]),
+                "raw_notes": override(cached["raw_notes"]),
+                "sources": override(cached["sources"]),
+                "final_report": cached["final_report"],
+                "report_with_source_ids": cached.get("report_with_source_ids", ""),
+                "run_cache_hit": True,
+                # force_refresh only applies to the turn that set it
+                "force_refresh": False,
+                "messages": ["Here is the final report: " + cached["final_report"]],
+            },
+        )
+
+    return Command(
+        goto="generate_report",
+        update={
+            "notes": override(cached["notes"]),
+            "raw_notes": override(cached["raw_notes"]),
+            "sources": override(cached["sources"]),
+            "run_cache_hit": True,
+        },
+    )
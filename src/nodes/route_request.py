@@ -0,0 +1,105 @@
+import re
+from typing import Literal
+from langchain.chat_models import init_chat_model
+from langchain_core.messages import HumanMessage
+from src.state import AgentState
+from src.schema import FollowUpIntent
+from src.llm import resilient
+from src.metrics import increment
+
+# Send follow-ups that ask to change a delivered report straight to revise_report
+FOLLOW_UP_REVISION_ENABLED = True
+
+# Follow-ups that may ask to reshape the existing report: they refer to the report itself
+# or are bare edit instructions. Only these are passed to the classifier, the rest go to scoping
+REVISION_PATTERN = re.compile(
+    r"\b(the|this|that|your|my) (report|draft|document|write-?up|summary|answer|"
+    r"introduction|conclusion)\b|"
+    r"\bmake (it|this|that)\b|"
+    r"\b(shorten|condense|rephrase|reword|reformat|rewrite|restructure|simplify|translate|"
+    r"proofread) (it|this|that)\b|"
+    r"^\W*(shorter|longer|more concise|less detail|more detail|tl;?dr)\b|"
+    r"^\W*(please\s+)?(add|remove|delete|drop|include|insert|cut|move|split|merge)\b.*"
+    r"\b(table|section|chart|graph|paragraph|bullet|list|heading|summary|introduction|"
+    r"conclusion|footnote)s?\b",
+    re.IGNORECASE,
+)
+
+# Follow-ups asking for research on something else are never treated as revisions
+NEW_RESEARCH_PATTERN = re.compile(
+    r"\b(new (question|topic|report)|research(ing|ed)?|investigat(e|ing|ed)|look (up|into)|find out|"
+    r"(do|same) (the same|for))\b",
+    re.IGNORECASE,
+)
+
+llm = init_chat_model(model="gpt-4o-mini", temperature=0)
+structured_llm = resilient(
+    llm.with_structured_output(FollowUpIntent),
+    name="route_request",
+    timeout=30,
+)
+
+ROUTE_REQUEST_PROMPT = """
+A research report was delivered to the user for this research brief:
+<Research Brief>
+{research_brief}
+</Research Brief>
+
+The user then sent this message:
+<Message>
+{message}
+</Message>
+
+Decide whether the message asks to change the delivered report itself, e.g. make it shorter, add a table of the figures it already covers, fix a section, change the tone or format.
+A new question, a request about another subject, or the same analysis for something else is NOT a revision, even when it uses words like "table", "section", "include" or "correct".
+When unsure, answer that it is not a revision.
+"""
+
+
+def is_revision_request(text: str) -> bool:
+    """
+    Whether a follow-up message may ask to revise the report rather than research something new.
+
+    Args:
+        text: Latest user message
+
+    Returns:
+        True for requests such as "make it shorter" or "add a table to the report"
+    """
+    return bool(REVISION_PATTERN.search(text)) and not NEW_RESEARCH_PATTERN.search(text)
+
+
+async def route_request(state: AgentState) -> Literal["revise_report", "scoping"]:
+    """
+    Route a user message to report revision or to the scoping phase.
+
+    Only messages arriving after a report was delivered can be revisions. Messages that look
+    like revisions are confirmed with a cheap classification call, anything unsure goes to scoping.
+    """
+    messages = state.get("messages", [])
+    if not (FOLLOW_UP_REVISION_ENABLED and state.get("final_report") and messages):
+        return "scoping"
+
+    last_message = messages[-1]
+    text = str(last_message.content)
+    if not (isinstance(last_message, HumanMessage) and is_revision_request(text)):
+        return "scoping"
+
+    try:
+        intent = await structured_llm.ainvoke(
+            [
+                HumanMessage(
+                    content=ROUTE_REQUEST_PROMPT.format(
+                        research_brief=state.get("research_brief", ""), message=text
+                    )
+                )
+            ]
+        )
+    except Exception as e:
+        print(f"Error classifying follow-up, starting scoping: {e}")
+        return "scoping"
+
+    if not intent.is_revision:
+        increment("route_request.rejected_revisions")
+        return "scoping"
+    return "revise_report"
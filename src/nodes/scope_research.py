@@ -0,0 +1,126 @@
+from src.state import AgentState
+from langgraph.types import Command
+from typing import Literal
+from src.schema import ScopeResearchRequest
+from langchain_core.messages import get_buffer_string, AIMessage, HumanMessage
+from langchain.chat_models import init_chat_model
+from src.utils import get_today_str
+from src.llm import resilient
+from langgraph.graph import END
+
+# Initialize the LLM and the structured LLM
+llm = init_chat_model(model="gpt-4o-mini", temperature=0)
+structured_llm = resilient(
+    llm.with_structured_output(ScopeResearchRequest),
+    name="scope_research",
+    timeout=60,
+)
+
+
+# System instruction
+SCOPE_RESEARCH_PROMPT = """
+These are the messages that have been exchanged so far between yourself and the user asking for the report:
+<Messages>
+{messages}
+</Messages>
+
+Today's date is {date}.
+
+You have two jobs, done in a single response:
+1. Assess whether you need to ask a clarifying question, or if the user has already provided enough information for you to start research.
+2. If no clarification is needed, translate the messages into a detailed and concrete research brief that will be used to guide the research.
+
+<Clarification>
+IMPORTANT: If you can see in the messages history that you have already asked a clarifying question, you almost always do not need to ask another one. Only ask another question if ABSOLUTELY NECESSARY.
+
+If there are acronyms, abbreviations, or unknown terms, ask the user to clarify.
+If you need to ask a question, follow these guidelines:
+- Be concise while gathering all necessary information
+- Use bullet points or numbered lists if appropriate for clarity. Make sure that this uses markdown formatting and will be rendered correctly if the string output is passed to a markdown renderer.
+- Don't ask for unnecessary information, or information that the user has already provided.
+</Clarification>
+
+<Research Brief Guidelines>
+1. Maximize Specificity and Detail
+- Include all known user preferences and explicitly list key attributes or dimensions to consider.
+- It is important that all details from the user are included in the brief.
+
+2. Handle Unstated Dimensions Carefully
+- When research quality requires considering additional dimensions that the user hasn't specified, acknowledge them as open considerations rather than assumed preferences.
+
+3. Avoid Unwarranted Assumptions
+- Never invent specific user preferences, constraints, or requirements that weren't stated.
+- If the user hasn't provided a particular detail, explicitly note this lack of specification.
+
+4. Distinguish Between Research Scope and User Preferences
+- Research scope: What topics/dimensions should be investigated (can be broader than user's explicit mentions)
+- User preferences: Specific constraints, requirements, or preferences (must only include what user stated)
+
+5. Use the First Person
+- Phrase the request from the perspective of the user.
+
+6. Sources
+- If specific sources should be prioritized, specify them in the brief.
+- For product and travel research, prefer official or primary websites rather than aggregator sites or SEO-heavy blogs.
+- For academic or scientific queries, prefer the original paper or official journal publication rather than survey papers or secondary summaries.
+- If the query is in a specific language, prioritize sources published in that language.
+</Research Brief Guidelines>
+
+If you need to ask a clarifying question, return:
+"need_clarification": true,
+"question": "<your clarifying question>",
+"verification": "",
+"research_brief": ""
+
+If you do not need to ask a clarifying question, return:
+"need_clarification": false,
+"question": "",
+"verification": "<concise acknowledgement that you have enough information, briefly summarizing the request and confirming research will now begin>",
+"research_brief": "<the detailed research brief>"
+"""
+
+
+# Node function
+async def scope_research(
+    state: AgentState,
+) -> Command[Literal[END, "lookup_run_cache"]]:
+    """
+    Fast path for the scoping phase that combines clarify_user_request and write_research_brief
+
+    A single structured call both decides whether clarification is needed and writes the research brief,
+    saving a full LLM round trip before the first search.
+
+    If the user request does not contain enough information route to end with clarification question
+    If the user request contain enough information route to the research phase with the brief, through the run cache
+    """
+
+    list_of_messages = state["messages"]
+
+    system_instruction = SCOPE_RESEARCH_PROMPT.format(
+        messages=get_buffer_string(list_of_messages),
+        date=get_today_str(),
+    )
+
+    messages = [
+        {
+            "role": "system",
+            "content": system_instruction,
+        }
+    ]
+
+    response = await structured_llm.ainvoke(messages)
+
+    if response.need_clarification:
+        return Command(
+            goto=END,
+            update={"messages": [AIMessage(content=response.question)]},
+        )
+    else:
+        return Command(
+            goto="lookup_run_cache",
+            update={
+                "messages": [AIMessage(content=response.verification)],
+                "research_brief": response.research_brief,
+                "supervisor_messages": [HumanMessage(content=response.research_brief)],
+            },
+        )
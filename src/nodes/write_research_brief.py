@@ -6,11 +6,16 @@ from langchain.chat_models import init_chat_model
 from src.schema import WriteResearchBrief
 from langchain_core.messages import get_buffer_string, AIMessage, HumanMessage
 from src.utils import get_today_str
+from src.llm import resilient
 
 
 # Initialize the LLM and the structured LLM
 llm = init_chat_model(model="gpt-4o-mini", temperature=0)
-structured_llm = llm.with_structured_output(WriteResearchBrief)
+structured_llm = resilient(
+    llm.with_structured_output(WriteResearchBrief),
+    name="write_research_brief",
+    timeout=60,
+)
 
 
 # System instruction
@@ -60,7 +65,7 @@ Guidelines:
 
 
 # Node function
-def write_research_brief(state: AgentState) -> Command[Literal["research_phase"]]:
+async def write_research_brief(state: AgentState) -> Command[Literal["lookup_run_cache"]]:
     """
     This node will be used to transform the conversation history into a research brief
 
@@ -80,10 +85,10 @@ def write_research_brief(state: AgentState) -> Command[Literal["research_phase"]
         }
     ]
 
-    response = structured_llm.invoke(messages)
+    response = await structured_llm.ainvoke(messages)
 
     return Command(
-        goto="research_phase",
+        goto="lookup_run_cache",
         update={
             "research_brief": response.research_brief,
             "supervisor_messages": [HumanMessage(content=response.research_brief)],
@@ -1,5 +1,13 @@
+import time
+import uuid
+import asyncio
 from src.research_agent.tools.tavily.tavily import tavily_search
-from src.research_agent.tools.think.think import think_tool
+from src.research_agent.tools.think.think import (
+    think_tool,
+    INLINE_REFLECTION,
+    split_inline_reflections,
+)
+from src.research_agent.tools.local_corpus.local_corpus import local_search
 from langchain.chat_models import init_chat_model
 from src.research_agent.state import (
     ResearcherState,
@@ -10,29 +18,69 @@ from src.research_agent.prompt import (
     RESEARCH_AGENT_PROMPT,
     COMPRESS_RESEARCH_SYSTEM_PROMPT,
     COMPRESS_RESEARCH_HUMAN_PROMPT,
+    FOLD_FINDINGS_PROMPT,
+    POLISH_FINDINGS_HUMAN_PROMPT,
+    REFLECTION_INLINE_INSTRUCTIONS,
+    REFLECTION_SEPARATE_INSTRUCTIONS,
 )
 from src.utils import get_today_str
-from langchain_core.messages import ToolMessage, filter_messages
-from typing import Literal
+from src.llm import resilient
+from src.blob_store import put_blob
+from langchain_core.messages import filter_messages
+from typing import Dict, List, Literal, Optional, Tuple
 from langgraph.graph import StateGraph, END
 
 # Get all the tools
-tools = [tavily_search, think_tool]
+tools = [local_search, tavily_search, think_tool]
 
 tools_by_name = {tool.name: tool for tool in tools}
 
 # Initialize Models
 model = init_chat_model(model="openai:gpt-4o-mini", temperature=0)
 
-model_with_tools = model.bind_tools(tools)
+# Tool choice calls are short, so slow ones are hedged
+model_with_tools = resilient(
+    model.bind_tools(tools), name="researcher", timeout=60, hedge=True
+)
 
 summarization_model = init_chat_model(model="openai:gpt-4o-mini", temperature=0)
 
-compress_model = init_chat_model(model="gpt-4.1", temperature=0, max_tokens=32000)
+compress_model = resilient(
+    init_chat_model(model="gpt-4.1", temperature=0, max_tokens=32000),
+    name="compress_research",
+    timeout=300,
+)
+
+# Fold each batch of tool results into a running findings draft in the background while the
+# researcher keeps searching, so compress_research only polishes the draft instead of reading every message
+INCREMENTAL_COMPRESSION = True
+
+# Fold tasks of researchers that never reached compress_research are dropped after this long
+FOLD_TASK_TTL_SECONDS = 3600
+
+# Background folds keyed by the fold_id of a researcher: (start time, fold tasks in tool step order)
+# Each task resolves to its new findings and the results it could not fold
+# Only touched from the event loop, so no locking is needed
+_folds: Dict[str, Tuple[float, List[asyncio.Task]]] = {}
+
+fold_model = resilient(
+    init_chat_model(model="gpt-4.1-mini", temperature=0, max_tokens=8000),
+    name="fold_findings",
+    timeout=120,
+)
+
+
+def search_results(messages) -> list:
+    """Tool messages holding search results, leaving out think_tool reflections."""
+    return [
+        m
+        for m in filter_messages(messages, include_types=["tool"])
+        if m.name != think_tool.name
+    ]
 
 
 # Agent Node
-def agent(state: ResearcherState):
+async def agent(state: ResearcherState):
     """
     This node analyzes the current state and decide on the next action to take.
 
@@ -53,15 +101,22 @@ def agent(state: ResearcherState):
     else:
         messages = messages
 
-    system_instruction = RESEARCH_AGENT_PROMPT.format(date=get_today_str())
+    system_instruction = RESEARCH_AGENT_PROMPT.format(
+        date=get_today_str(),
+        reflection_instructions=(
+            REFLECTION_INLINE_INSTRUCTIONS
+            if INLINE_REFLECTION
+            else REFLECTION_SEPARATE_INSTRUCTIONS
+        ),
+    )
 
-    response = model_with_tools.invoke([{"role": "system", "content": system_instruction}] + messages)
+    response = await model_with_tools.ainvoke([{"role": "system", "content": system_instruction}] + messages)
 
     return {"researcher_messages": [response]}
 
 
 # Define tool node
-def tool_node(state: ResearcherState):
+async def tool_node(state: ResearcherState):
     """
     This node will execute the tool calls based on the model's decision.
 
@@ -72,26 +127,123 @@ def tool_node(state: ResearcherState):
 
     tool_calls = state["researcher_messages"][-1].tool_calls
 
-    tool_results = []
+    # Reflections made alongside a search are recorded without running think_tool
+    reflection_messages, reflections, tool_calls = split_inline_reflections(tool_calls)
+
+    # The search tool receives the research topic so it can focus page summaries on it
+    def tool_args(tool_call: dict) -> dict:
+        if tool_call["name"] == tavily_search.name:
+            return {**tool_call["args"], "research_topic": state["research_brief"]}
+        return tool_call["args"]
+
+    # Execute all tool calls concurrently
+    # Invoking with the full tool call returns ToolMessages that carry the tool artifacts
+    tool_response = await asyncio.gather(
+        *(
+            tools_by_name[tool_call["name"]].ainvoke(
+                {**tool_call, "args": tool_args(tool_call), "type": "tool_call"}
+            )
+            for tool_call in tool_calls
+        )
+    )
+
+    # Search tools return the sources they cited as artifact, keyed by source id
+    sources = {}
+    for message in tool_response:
+        if isinstance(message.artifact, dict):
+            sources.update(message.artifact)
+
+    update = {
+        "researcher_messages": reflection_messages + list(tool_response),
+        "sources": sources,
+        "reflections": reflections,
+    }
+
+    # Fold the new results in the background, compress_research joins the fold
+    if INCREMENTAL_COMPRESSION:
+        fold_id = state.get("fold_id") or uuid.uuid4().hex
+        start_fold(fold_id, state["research_brief"], search_results(tool_response))
+        update["fold_id"] = fold_id
+
+    return update
 
-    # Execute all tool calls
-    for tool_call in tool_calls:
-        tool = tools_by_name[tool_call["name"]]
-        tool_results.append(tool.invoke(tool_call["args"]))
 
-    # Create a tool message outputs
-    tool_response = [
-        ToolMessage(
-            content=result, name=tool_call["name"], tool_call_id=tool_call["id"]
+# Define incremental compression
+async def fold_findings(
+    research_topic: str, findings_draft: str, new_results: list
+) -> Tuple[str, List]:
+    """
+    Fold the newest tool results into findings that extend the running draft.
+
+    Runs as a background task started by the tool node, so it never delays the research loop.
+    Folds of consecutive tool steps run concurrently, each one sees the findings of the folds
+    finished when it started. Only the new findings are generated, which keeps each call small
+    however long the research runs.
+
+    Args:
+        research_topic: Research topic of the researcher
+        findings_draft: Findings folded so far, used to avoid repeating them
+        new_results: Tool messages of the latest tool step
+
+    Returns:
+        Tuple of the new findings and the tool messages that could not be folded
+    """
+    system_instruction = FOLD_FINDINGS_PROMPT.format(
+        date=get_today_str(),
+        research_topic=research_topic,
+        findings_draft=findings_draft or "(empty)",
+    )
+
+    try:
+        response = await fold_model.ainvoke(
+            [{"role": "system", "content": system_instruction}]
+            + [{"role": "user", "content": "\n\n".join(str(m.content) for m in new_results)}]
         )
-        for result, tool_call in zip(tool_results, tool_calls)
-    ]
+    except Exception as e:
+        # Unfolded results are handed to compress_research as they are
+        print(f"Error folding findings: {e}")
+        return "", new_results
+
+    return str(response.content).strip(), []
+
+
+def start_fold(fold_id: str, research_topic: str, new_results: list) -> None:
+    """Start a background fold of the new tool results of a researcher."""
+    now = time.monotonic()
+    for stale_id in [i for i, (t, _) in _folds.items() if now - t > FOLD_TASK_TTL_SECONDS]:
+        for task in _folds.pop(stale_id)[1]:
+            task.cancel()
+    if not new_results:
+        return
+
+    started_at, tasks = _folds.get(fold_id, (now, []))
+    findings_draft = "\n\n".join(
+        task.result()[0]
+        for task in tasks
+        if task.done() and not task.cancelled() and not task.exception()
+    )
+    task = asyncio.create_task(fold_findings(research_topic, findings_draft, new_results))
+    _folds[fold_id] = (started_at, tasks + [task])
 
-    return {"researcher_messages": tool_response}
+
+async def join_folds(fold_id: str) -> Tuple[str, List]:
+    """
+    Wait for the background folds of a researcher.
+
+    Returns:
+        Tuple of the findings draft, in tool step order, and the tool messages that were not folded
+    """
+    if fold_id not in _folds:
+        return "", []
+    _, tasks = _folds.pop(fold_id)
+    folds = await asyncio.gather(*tasks)
+    findings_draft = "\n\n".join(findings for findings, _ in folds if findings)
+    unfolded_results = [message for _, unfolded in folds for message in unfolded]
+    return findings_draft, unfolded_results
 
 
 # Define summarization node
-def compress_research(state: ResearcherState):
+async def compress_research(state: ResearcherState):
     """
     Compress research finding into a concise summary.
 
@@ -115,7 +267,22 @@ def compress_research(state: ResearcherState):
         + [{"role": "user", "content": human_instruction}]
     )
 
-    response = compress_model.invoke(messages)
+    # With a findings draft only the draft and any results the fold could not handle are polished
+    # Without the fold task (e.g. after a resume in another process) all messages are compressed
+    findings_draft, unfolded_results = await join_folds(state.get("fold_id", ""))
+
+    if findings_draft:
+        human_instruction = POLISH_FINDINGS_HUMAN_PROMPT.format(
+            research_topic=research_topic,
+            findings_draft=findings_draft,
+            unfolded_results="\n\n".join(str(m.content) for m in unfolded_results) or "(none)",
+        )
+        messages = [
+            {"role": "system", "content": system_instruction},
+            {"role": "user", "content": human_instruction},
+        ]
+
+    response = await compress_model.ainvoke(messages)
 
     # Extract raw notes from tool and AI messages
     raw_notes = [
@@ -125,9 +292,12 @@ def compress_research(state: ResearcherState):
         )
     ]
 
+    # Offload the raw notes to the blob store and keep only the reference in state
+    raw_notes_ref = put_blob("\n".join(raw_notes))
+
     return {
         "compressed_research": str(response.content),
-        "raw_notes": ["\n".join(raw_notes)],
+        "raw_notes": [raw_notes_ref],
     }
 
 
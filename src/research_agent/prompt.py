@@ -9,11 +9,12 @@ You can call these tools in series or in parallel, your research is conducted in
 </Task>
 
 <Available Tools>
-You have access to two main tools:
-1. **tavily_search**: For conducting web searches to gather information
-2. **think_tool**: For reflection and strategic planning during research
+You have access to three main tools:
+1. **local_search**: For searching pages already fetched in earlier research. It is instant and free, so try it first when the topic is close to research done earlier; for a new topic go straight to tavily_search
+2. **tavily_search**: For conducting web searches to gather information. Pass a list of queries to cover several angles in a single call, they run in parallel. Use it when local_search has nothing relevant or recent enough
+3. **think_tool**: For reflection and strategic planning during research
 
-**CRITICAL: Use think_tool after each search to reflect on results and plan next steps**
+{reflection_instructions}
 </Available Tools>
 
 <Instructions>
@@ -63,7 +64,7 @@ Only these fully comprehensive cleaned findings are going to be returned to the
 
 <Tool Call Filtering>
 **IMPORTANT**: When processing the research messages, focus only on substantive research content:
-- **Include**: All tavily_search results and findings from web searches
+- **Include**: All tavily_search and local_search results and findings from web searches
 - **Exclude**: think_tool calls and responses - these are internal agent reflections for decision-making and should not be included in the final research report
 - **Focus on**: Actual information gathered from external sources, not the agent's internal reasoning process
 
@@ -87,12 +88,13 @@ The report should be structured like this:
 </Output Format>
 
 <Citation Rules>
-- Assign each unique URL a single citation number in your text
-- End with ### Sources that lists each source with corresponding numbers
-- IMPORTANT: Number sources sequentially without gaps (1,2,3,4...) in the final list regardless of which sources you choose
+- Every source in the search results is labelled with a short id such as [S3f9a2c]
+- Cite sources inline with that exact id in square brackets, e.g. "Sales grew 20% [S3f9a2c]"
+- Never replace the ids with numbers or URLs, the ids are resolved to URLs when the final report is written
+- End with ### Sources that lists each source id with its title
 - Example format:
-  [1] Source Title: URL
-  [2] Source Title: URL
+  [S3f9a2c] Source Title
+  [S0b1d4e] Source Title
 </Citation Rules>
 
 Critical Reminder: It is extremely important that any information that is even remotely relevant to the user's research topic is preserved verbatim (e.g. don't rewrite it, don't summarize it, don't paraphrase it).
@@ -113,4 +115,51 @@ CRITICAL REQUIREMENTS:
 - Include ALL sources and citations found during research
 - Remember this research was conducted to answer the specific question above
 
-The cleaned findings will be used for final report generation, so comprehensiveness is critical."""
\ No newline at end of file
+The cleaned findings will be used for final report generation, so comprehensiveness is critical."""
+
+FOLD_FINDINGS_PROMPT = """
+You are a research assistant keeping a running findings document while a researcher is still searching.
+For context, today's date is {date}.
+
+RESEARCH TOPIC: {research_topic}
+
+<Task>
+You are given the newest batch of search results. Clean them up into findings that extend the document below.
+- Repeat all information relevant to the research topic verbatim, in a cleaner format
+- Skip information that is irrelevant or already present in the current document
+- Cite sources inline with the exact ids from the search results, e.g. "Sales grew 20% [S3f9a2c]"
+- Output ONLY the new findings, do not repeat the current document and do not add a sources list
+- If the batch contains nothing new, output nothing
+</Task>
+
+<Current Findings Document>
+{findings_draft}
+</Current Findings Document>
+"""
+
+POLISH_FINDINGS_HUMAN_PROMPT = """
+A researcher conducted research on the following topic and the findings were already cleaned up batch by batch while searching:
+
+RESEARCH TOPIC: {research_topic}
+
+<Findings Draft>
+{findings_draft}
+</Findings Draft>
+
+<Search Results Not Yet In The Draft>
+{unfolded_results}
+</Search Results Not Yet In The Draft>
+
+Your task is to turn the draft, plus any search results not yet in it, into the final cleaned findings.
+
+CRITICAL REQUIREMENTS:
+- Merge duplicate statements and order the findings logically, but keep every fact, name, number and detail verbatim
+- Keep every inline source id exactly as it appears in the draft
+- End with the "### Sources" list of every source id cited, as described in the citation rules
+- The cleaned findings will be used for final report generation, so comprehensiveness is critical."""
+
+
+REFLECTION_SEPARATE_INSTRUCTIONS = "**CRITICAL: Use think_tool after each search to reflect on results and plan next steps**"
+
+REFLECTION_INLINE_INSTRUCTIONS = """**CRITICAL: Use think_tool after each search to reflect on results and plan next steps**
+**Reflect in the same turn as you act**: Call think_tool together with your next search tool call in a single response (parallel tool calls), not in a response of its own. Only call think_tool alone right before you stop researching."""
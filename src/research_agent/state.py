@@ -1,7 +1,9 @@
-from typing import Annotated, TypedDict, Sequence, List
+from typing import Annotated, TypedDict, Sequence, List, Dict
 import operator
 from langchain_core.messages import BaseMessage
 from langgraph.graph.message import add_messages
+from src.blob_store import BlobRef
+from src.sources import Source, merge_sources
 
 
 class ResearcherInputState(TypedDict):
@@ -24,7 +26,13 @@ class ResearcherState(TypedDict):
     researcher_messages: Annotated[Sequence[BaseMessage], add_messages]
     tool_call_iterations: int
     compressed_research: str
-    raw_notes: Annotated[List[str], operator.add]
+    raw_notes: Annotated[List[BlobRef], operator.add]
+    # Sources cited by the search tools keyed by their compact source id
+    sources: Annotated[Dict[str, Source], merge_sources]
+    # Reflections made in the same turn as a search, recorded without a think_tool round trip
+    reflections: Annotated[List[str], operator.add]
+    # Key of the background fold building the findings draft while the research is still going
+    fold_id: str
 
 
 class ResearcherOutputState(TypedDict):
@@ -35,5 +43,6 @@ class ResearcherOutputState(TypedDict):
     """
 
     compressed_research: str
-    raw_notes: Annotated[List[str], operator.add]
+    raw_notes: Annotated[List[BlobRef], operator.add]
     researcher_messages: Annotated[Sequence[BaseMessage], add_messages]
+    sources: Annotated[Dict[str, Source], merge_sources]
@@ -0,0 +1,100 @@
+import os
+import time
+import sqlite3
+from typing import Dict, List
+
+from src.similarity import tokenize
+
+# SQLite database holding every page fetched by the search tools
+LOCAL_CORPUS_DB = os.getenv("LOCAL_CORPUS_DB", ".cache/local_corpus.sqlite")
+
+# Pages older than this are not served from the local corpus
+LOCAL_CORPUS_MAX_AGE_DAYS = 30
+
+# Pages whose title and summary contain less than this share of the query words are not returned
+LOCAL_SEARCH_MIN_MATCHED_TERMS = 0.6
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the corpus database, creating the FTS5 table on first use."""
+    os.makedirs(os.path.dirname(LOCAL_CORPUS_DB) or ".", exist_ok=True)
+    connection = sqlite3.connect(LOCAL_CORPUS_DB, timeout=30)
+    connection.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5("
+        "url UNINDEXED, title, summary, content, fetched_at UNINDEXED)"
+    )
+    return connection
+
+
+def index_page(url: str, title: str, content: str, summary: str) -> None:
+    """
+    Store a fetched page and its summary in the local full-text index.
+
+    Re-indexing a url replaces the previous version of the page.
+
+    Args:
+        url: Url of the page
+        title: Title of the page
+        content: Raw content of the page
+        summary: Summary produced for the page
+    """
+    with _connect() as connection:
+        connection.execute("DELETE FROM pages WHERE url = ?", (url,))
+        connection.execute(
+            "INSERT INTO pages (url, title, summary, content, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (url, title, summary, content, time.time()),
+        )
+    connection.close()
+
+
+def _to_match_expression(words: List[str]) -> str:
+    """
+    Turn the content words of a query into an FTS5 expression that matches any of them.
+
+    Words are quoted so user text can never be parsed as FTS5 syntax, and matched as prefixes
+    so the singular form found by tokenize also matches plurals in the pages.
+    """
+    return " OR ".join(f'"{word}"*' for word in words)
+
+
+def matched_terms(words: List[str], title: str, summary: str) -> float:
+    """Share of the query words found in the title and summary of a page."""
+    page_words = set(tokenize(f"{title} {summary}"))
+    return sum(1 for word in words if word in page_words) / len(words)
+
+
+def search_pages(query: str, max_results: int = 5) -> Dict[str, Dict]:
+    """
+    Search the local corpus with BM25 ranking.
+
+    Stop words are ignored, and pages matching too few of the query words
+    (LOCAL_SEARCH_MIN_MATCHED_TERMS) are dropped, so off-topic pages are not returned.
+
+    Args:
+        query: Free text search query
+        max_results: Maximum number of pages to return
+
+    Returns:
+        Dictionary of matching pages keyed by url with title, content (the stored summary) and fetched_at
+    """
+    words = list(dict.fromkeys(tokenize(query)))
+    if not words:
+        return {}
+
+    min_fetched_at = time.time() - LOCAL_CORPUS_MAX_AGE_DAYS * 24 * 3600
+    with _connect() as connection:
+        rows: List = connection.execute(
+            "SELECT url, title, summary, fetched_at FROM pages "
+            "WHERE pages MATCH ? AND fetched_at >= ? "
+            "ORDER BY bm25(pages, 0.0, 5.0, 2.0, 1.0, 0.0) LIMIT ?",
+            (_to_match_expression(words), min_fetched_at, max_results * 4),
+        ).fetchall()
+    connection.close()
+
+    results = {}
+    for url, title, summary, fetched_at in rows:
+        if matched_terms(words, title, summary) >= LOCAL_SEARCH_MIN_MATCHED_TERMS:
+            results[url] = {"title": title, "content": summary, "fetched_at": fetched_at}
+        if len(results) == max_results:
+            break
+    return results
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Annotated, Dict, Tuple
+from langchain_core.tools import tool, InjectedToolArg
+from src.metrics import increment
+from src.research_agent.tools.local_corpus.index import search_pages
+from src.research_agent.tools.tavily.utils import (
+    format_search_results,
+    build_source_table,
+)
+
+
+@tool(parse_docstring=True, response_format="content_and_artifact")
+async def local_search(
+    query: str,
+    max_results: Annotated[int, InjectedToolArg] = 5,
+) -> Tuple[str, Dict]:
+    """
+    Search the local corpus of web pages fetched during earlier research.
+
+    This returns in milliseconds and costs nothing, so try it before tavily_search when
+    the topic is close to research done earlier.
+    Use tavily_search when the local results are missing, off-topic or out of date,
+    each page shows the date it was fetched.
+    Each source is labelled with a short id such as [S3f9a2c], cite sources by that id.
+
+    Args:
+        query: Search query to execute
+        max_results: Maximum number of pages to return
+
+    Returns:
+        Formatted string of matching pages with their summaries, and the source table entries as artifact
+    """
+    try:
+        print(f"Starting local corpus search for query: '{query}'")
+
+        # SQLite calls are blocking, keep them off the event loop
+        results = await asyncio.to_thread(search_pages, query, max_results)
+
+        increment("local_search.calls")
+        if not results:
+            return "No pages found in the local corpus. Use tavily_search to search the web.", {}
+
+        increment("local_search.hits")
+        print(f"Found {len(results)} pages in the local corpus")
+        formatted_output = (
+            "Local corpus results (pages fetched in earlier research):\n"
+            + format_search_results(results)
+        )
+        return formatted_output, build_source_table(results)
+
+    except Exception as e:
+        error_msg = f"Error during local corpus search for query '{query}': {str(e)}"
+        print(error_msg)
+        return error_msg, {}
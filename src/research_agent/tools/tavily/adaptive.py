@@ -0,0 +1,58 @@
+from typing import Dict, List
+
+from src.similarity import normalize_tokens, containment
+
+# Search without raw content first and only pull the pages that look relevant
+ADAPTIVE_SEARCH_ENABLED = True
+
+# Results below this Tavily relevance score are dropped
+SEARCH_MIN_SCORE = 0.3
+
+# Results whose title and snippet contain less than this share of the query words are dropped
+SNIPPET_MIN_RELEVANCE = 0.3
+
+# Queries keeping fewer results than this are searched again with more results
+ADAPTIVE_MIN_RESULTS_PER_QUERY = 2
+
+# Upper bound on max_results when a query is widened
+ADAPTIVE_MAX_RESULTS = 8
+
+
+def snippet_relevance(result: Dict, query: str, research_topic: str = "") -> float:
+    """
+    Share of the query words found in the title and snippet of a search result.
+
+    When the query words are missing, words of the research topic count at half weight.
+
+    Args:
+        result: Tavily search result without raw content
+        query: Search query that returned the result
+        research_topic: Research topic of the researcher that issued the query
+
+    Returns:
+        Relevance between 0.0 and 1.0
+    """
+    snippet = normalize_tokens(f"{result.get('title', '')} {result.get('content', '')}")
+    query_relevance = containment(normalize_tokens(query), snippet)
+    topic_relevance = containment(normalize_tokens(research_topic), snippet) / 2
+    return max(query_relevance, topic_relevance)
+
+
+def prune_results(response: Dict, research_topic: str = "") -> List[Dict]:
+    """
+    Keep the results of a lightweight search that clear the score and snippet relevance thresholds.
+
+    Args:
+        response: Tavily search response without raw content
+        research_topic: Research topic of the researcher that issued the query
+
+    Returns:
+        Results worth pulling and summarizing, in ranking order
+    """
+    return [
+        result
+        for result in response.get("results", [])
+        if result.get("score", 1.0) >= SEARCH_MIN_SCORE
+        and snippet_relevance(result, response.get("query", ""), research_topic)
+        >= SNIPPET_MIN_RELEVANCE
+    ]
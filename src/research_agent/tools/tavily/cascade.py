@@ -0,0 +1,47 @@
+import re
+from typing import Literal
+
+# Pick the summarization model by page size and density instead of sending every page to the large model
+SUMMARY_CASCADE_ENABLED = True
+
+# Cleaned pages with fewer words than this are used as they are, without a model call
+SUMMARY_SHORT_PAGE_WORDS = 300
+
+# Cleaned pages with at least this many words are summarized by the large model
+SUMMARY_LONG_PAGE_WORDS = 3000
+
+# Medium pages where at least this share of the words are figures (tables, financials, benchmarks)
+# are summarized by the large model, the small model tends to drop numbers
+SUMMARY_DENSE_NUMBER_RATIO = 0.08
+
+SummaryTier = Literal["short", "medium", "long"]
+
+_WORD = re.compile(r"\S+")
+_FIGURE = re.compile(r"[$€£]?\d[\d.,:/%]*[%kKmMbB]?")
+
+
+def number_ratio(words: list[str]) -> float:
+    """Share of the words that are figures: numbers, percentages, amounts, dates."""
+    if not words:
+        return 0.0
+    return sum(1 for word in words if _FIGURE.fullmatch(word.strip("()[],;"))) / len(words)
+
+
+def summary_tier(webpage_content: str) -> SummaryTier:
+    """
+    Choose how a cleaned page is summarized.
+
+    Args:
+        webpage_content: Cleaned content of the webpage
+
+    Returns:
+        "short" to use the page as it is, "medium" for the small model, "long" for the large model
+    """
+    words = _WORD.findall(webpage_content)
+    if len(words) < SUMMARY_SHORT_PAGE_WORDS:
+        return "short"
+    if len(words) >= SUMMARY_LONG_PAGE_WORDS:
+        return "long"
+    if number_ratio(words) >= SUMMARY_DENSE_NUMBER_RATIO:
+        return "long"
+    return "medium"
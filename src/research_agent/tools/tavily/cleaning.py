@@ -0,0 +1,168 @@
+import re
+import html
+from typing import Dict, Tuple
+
+from src.metrics import increment
+
+# Lines longer than this are never treated as boilerplate, whatever they contain
+BOILERPLATE_MAX_WORDS = 12
+
+# Consecutive link-only lines from this count on are treated as a link farm (menus, related links)
+LINK_FARM_MIN_LINES = 3
+
+# Menu-shaped lines ("Home | About | Contact") among the first or last lines of a page are navigation
+NAV_EDGE_LINES = 3
+
+# Widget labels, dropped only when the whole line is made of them ("Sign in | Sign up", "Advertisement")
+_WIDGET_LABEL = (
+    r"(accept( all)?( cookies)?|reject all|cookie (settings|preferences|policy)|privacy policy|"
+    r"terms of (use|service)|sign (in|up|out)|log ?(in|out)|skip to (main )?content|"
+    r"share( this( article| page| post)?| on \w+)?|follow us( on \w+)?|advertisement|"
+    r"back to top|read more|subscribe)"
+)
+WIDGET_LINE_PATTERN = re.compile(
+    rf"^[\W_]*{_WIDGET_LABEL}([\W_]+{_WIDGET_LABEL})*[\W_]*$", re.IGNORECASE
+)
+
+# Banner and footer phrases, dropped when they appear anywhere in a short line
+# A copyright sign alone can open a cited figure ("© 2024 data from IEA shows ..."), so it only
+# counts next to a footer word
+BANNER_PATTERN = re.compile(
+    r"\b(we use cookies|(this|our) (web)?site uses cookies|all rights reserved|"
+    r"subscribe to (our )?newsletter)\b|"
+    r"(©|\bcopyright\b).*\b(rights|inc|ltd|llc|gmbh|corp|corporation|plc|limited|"
+    r"privacy|terms)\b",
+    re.IGNORECASE,
+)
+HTML_TAG_PATTERN = re.compile(r"<(script|style)[^>]*>.*?</\1>|<[^>]+>", re.IGNORECASE | re.DOTALL)
+MARKDOWN_IMAGE_PATTERN = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+MARKDOWN_LINK_PATTERN = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+URL_PATTERN = re.compile(r"https?://\S+")
+TABLE_SEPARATOR_PATTERN = re.compile(r"^\s*\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?\s*$")
+
+
+def _is_link_line(line: str) -> bool:
+    """A line made of links with at most a few words of other text."""
+    links = len(MARKDOWN_LINK_PATTERN.findall(line)) + len(URL_PATTERN.findall(line))
+    if not links:
+        return False
+    text = URL_PATTERN.sub("", MARKDOWN_LINK_PATTERN.sub("", line))
+    return len(re.findall(r"\w+", text)) <= 3
+
+
+def _is_nav_line(line: str) -> bool:
+    """
+    A menu-shaped line such as "Home | About | Contact".
+
+    Lists written the same way ("Python · Rust · Go") hold content, the caller only drops
+    menu-shaped lines at the edges of the page or in runs of links.
+    """
+    # Markdown table rows also use pipes but hold content
+    if line.startswith("|"):
+        return False
+    segments = [s.strip() for s in re.split(r"\s[|•·»]\s", line)]
+    # Rows of figures such as "Q1 | Q2 | Q3 | Q4" are data, menus hold no digits
+    if any(char.isdigit() for char in line):
+        return False
+    return len(segments) >= 3 and all(len(s.split()) <= 3 for s in segments)
+
+
+def _is_link_menu(line: str) -> bool:
+    """A menu-shaped line whose items are all links."""
+    segments = [s.strip() for s in re.split(r"\s[|•·»]\s", line)]
+    return all(MARKDOWN_LINK_PATTERN.fullmatch(s) for s in segments)
+
+
+def _is_boilerplate(line: str) -> bool:
+    """A line made only of widget labels, or a short line with a cookie banner or footer phrase."""
+    if WIDGET_LINE_PATTERN.match(line):
+        return True
+    return len(line.split()) <= BOILERPLATE_MAX_WORDS and bool(BANNER_PATTERN.search(line))
+
+
+def clean_raw_content(content: str) -> Tuple[str, Dict[str, int]]:
+    """
+    Remove boilerplate from raw page content before it is summarized.
+
+    Strips HTML tags, images, navigation menus, link farms, cookie banners, footers,
+    markdown table separators and repeated lines, keeps link text, and collapses whitespace.
+
+    Args:
+        content: Raw page content as returned by Tavily
+
+    Returns:
+        Tuple of the cleaned content and stats with bytes_in, bytes_out and tokens_removed
+    """
+    text = html.unescape(HTML_TAG_PATTERN.sub(" ", content))
+    text = MARKDOWN_IMAGE_PATTERN.sub("", text)
+
+    lines = text.splitlines()
+    keep = [True] * len(lines)
+
+    # Drop runs of link-only lines (menus, "related articles" lists, footers)
+    run_start = None
+    for i, line in enumerate(lines + [""]):
+        if i < len(lines) and _is_link_line(line):
+            run_start = i if run_start is None else run_start
+            continue
+        if run_start is not None and i - run_start >= LINK_FARM_MIN_LINES:
+            for j in range(run_start, i):
+                keep[j] = False
+        run_start = None
+
+    # Rows of a table written without leading pipes are content, not menus
+    in_table = [False] * len(lines)
+    for i, line in enumerate(lines):
+        if "|" in line and TABLE_SEPARATOR_PATTERN.match(line.strip()):
+            j = i - 1
+            while j >= 0 and "|" in lines[j]:
+                in_table[j] = True
+                j -= 1
+            j = i + 1
+            while j < len(lines) and "|" in lines[j]:
+                in_table[j] = True
+                j += 1
+
+    # Menus sit at the top or bottom of the page, or come as runs of link lines
+    # A single menu-shaped line within the text is a list of items and is kept
+    nav = [not table_row and _is_nav_line(line.strip()) for line, table_row in zip(lines, in_table)]
+    non_empty = [i for i, line in enumerate(lines) if line.strip()]
+    edges = set(non_empty[:NAV_EDGE_LINES] + non_empty[-NAV_EDGE_LINES:])
+    for position, i in enumerate(non_empty):
+        if not nav[i] or i in edges:
+            continue
+        neighbours = non_empty[max(position - 1, 0):position] + non_empty[position + 1:position + 2]
+        in_run = any(nav[j] for j in neighbours)
+        nav[i] = in_run and _is_link_menu(lines[i].strip())
+
+    seen = set()
+    cleaned_lines = []
+    for line, kept, is_nav in zip(lines, keep, nav):
+        stripped = line.strip()
+        if not kept or TABLE_SEPARATOR_PATTERN.match(stripped):
+            continue
+        if is_nav or _is_boilerplate(stripped):
+            continue
+        # Keep the link text, drop the target
+        stripped = MARKDOWN_LINK_PATTERN.sub(r"\1", stripped)
+        stripped = re.sub(r"[ \t]+", " ", stripped)
+        # Repeated headers and widgets show up several times on a page, table rows and list items may repeat
+        is_repeat = stripped in seen and not re.match(r"^(\||[-*+] |\d+[.)] )", stripped)
+        if stripped and is_repeat and len(stripped.split()) <= BOILERPLATE_MAX_WORDS:
+            continue
+        seen.add(stripped)
+        cleaned_lines.append(stripped)
+
+    cleaned = re.sub(r"\n{3,}", "\n\n", "\n".join(cleaned_lines)).strip()
+
+    bytes_in = len(content.encode("utf-8"))
+    bytes_out = len(cleaned.encode("utf-8"))
+    stats = {
+        "bytes_in": bytes_in,
+        "bytes_out": bytes_out,
+        # Rough estimate at about 4 bytes per token for English text
+        "tokens_removed": (bytes_in - bytes_out) // 4,
+    }
+    increment("cleaning.bytes_in", bytes_in)
+    increment("cleaning.bytes_out", bytes_out)
+    return cleaned, stats
@@ -0,0 +1,200 @@
+import os
+import time
+import random
+import asyncio
+import weakref
+from typing import Dict, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from src.metrics import increment
+from src.hedging import LatencyTracker, hedged
+from src.cassette import through_cassette
+
+load_dotenv(override=True)
+
+TAVILY_API_BASE_URL = "https://api.tavily.com"
+
+# Per request timeout, a single attempt is abandoned after this many seconds
+SEARCH_TIMEOUT_SECONDS = 30
+
+# Number of retries after the first attempt for transient errors (timeouts, 429 and 5xx)
+SEARCH_MAX_RETRIES = 3
+
+# Exponential backoff between retries with full jitter, capped at the max delay
+SEARCH_BACKOFF_BASE_SECONDS = 0.5
+SEARCH_BACKOFF_MAX_SECONDS = 8.0
+
+# Fire a duplicate request when the first has not returned after the observed p95 latency
+SEARCH_HEDGING_ENABLED = True
+
+# Hedge delay used until enough latencies have been observed to estimate the p95
+SEARCH_HEDGE_DEFAULT_DELAY_SECONDS = 6.0
+SEARCH_HEDGE_MIN_SAMPLES = 20
+
+# Size of the pooled HTTP connections shared by every search in the process
+SEARCH_MAX_CONNECTIONS = 20
+
+# Maximum number of urls Tavily accepts in a single extract request
+EXTRACT_MAX_URLS = 20
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class TransientSearchError(Exception):
+    """Raised for search failures that are worth retrying."""
+
+
+class AsyncTavilyClient:
+    """
+    Async Tavily API client with a pooled HTTP session, bounded retries and hedged requests.
+    """
+
+    def __init__(self, api_key: Optional[str] = None):
+        self._client = httpx.AsyncClient(
+            base_url=TAVILY_API_BASE_URL,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {api_key or os.getenv('TAVILY_API_KEY')}",
+            },
+            timeout=SEARCH_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=SEARCH_MAX_CONNECTIONS,
+                max_keepalive_connections=SEARCH_MAX_CONNECTIONS,
+            ),
+        )
+        # Recent successful request latencies per API path used to estimate the hedge delay
+        # Extract batches are much slower than searches and must not inflate the search p95
+        self._latencies: Dict[str, LatencyTracker] = {}
+
+    def _latency_tracker(self, path: str) -> LatencyTracker:
+        """Latency tracker of an API path."""
+        if path not in self._latencies:
+            self._latencies[path] = LatencyTracker(
+                SEARCH_HEDGE_DEFAULT_DELAY_SECONDS, min_samples=SEARCH_HEDGE_MIN_SAMPLES
+            )
+        return self._latencies[path]
+
+    async def _post(self, path: str, payload: Dict) -> Dict:
+        """Send a single request and classify the failure modes."""
+        start = time.monotonic()
+        try:
+            response = await self._client.post(path, json=payload)
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            raise TransientSearchError(f"{type(e).__name__}: {str(e)}") from e
+
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            raise TransientSearchError(f"HTTP {response.status_code}: {response.text[:200]}")
+        response.raise_for_status()
+
+        self._latency_tracker(path).record(time.monotonic() - start)
+        return response.json()
+
+    async def _hedged_post(self, path: str, payload: Dict, hedge: bool) -> Dict:
+        """
+        Send a request and, if it is slower than the hedge delay of its path, race it against a duplicate.
+        """
+        if not (hedge and SEARCH_HEDGING_ENABLED):
+            return await self._post(path, payload)
+
+        return await hedged(
+            lambda: self._post(path, payload), self._latency_tracker(path).p95(), "search"
+        )
+
+    async def _request(self, path: str, payload: Dict, hedge: bool = True) -> Dict:
+        """
+        Send a request with bounded retries and jittered exponential backoff on transient errors.
+
+        Requests go through the record/replay cassette, see src/cassette.py.
+
+        Args:
+            path: API path
+            payload: JSON body of the request
+            hedge: Whether a slow request may be duplicated, only for cheap idempotent calls
+        """
+        # Counted before the cassette so record and replay report the same requests,
+        # retried attempts are counted separately under search.retries
+        increment("search.requests")
+        return await through_cassette(
+            "search", path, payload, lambda: self._request_with_retries(path, payload, hedge)
+        )
+
+    async def _request_with_retries(self, path: str, payload: Dict, hedge: bool) -> Dict:
+        """Send a request, retrying transient errors."""
+        for attempt in range(SEARCH_MAX_RETRIES + 1):
+            try:
+                return await self._hedged_post(path, payload, hedge)
+            except TransientSearchError as e:
+                if attempt == SEARCH_MAX_RETRIES:
+                    raise
+                delay = random.uniform(
+                    0, min(SEARCH_BACKOFF_MAX_SECONDS, SEARCH_BACKOFF_BASE_SECONDS * 2**attempt)
+                )
+                print(f"Transient search error ({str(e)}), retrying in {delay:.1f}s")
+                increment("search.retries")
+                await asyncio.sleep(delay)
+
+    async def search(
+        self,
+        query: str,
+        max_results: int = 3,
+        topic: str = "general",
+        include_raw_content: bool = True,
+    ) -> Dict:
+        """
+        Perform a Tavily search.
+
+        Args:
+            query: Search query to execute
+            max_results: Maximum number of results to return
+            topic: Topic of the search
+            include_raw_content: Whether to include raw content in the results
+
+        Returns:
+            Tavily search response with the list of results
+        """
+        return await self._request(
+            "/search",
+            {
+                "query": query,
+                "max_results": max_results,
+                "topic": topic,
+                "include_raw_content": include_raw_content,
+            },
+        )
+
+    async def extract(self, urls: List[str]) -> Dict:
+        """
+        Pull the raw content of pages with Tavily extract.
+
+        Extract requests are billed per page and never hedged.
+
+        Args:
+            urls: Urls of the pages, at most EXTRACT_MAX_URLS
+
+        Returns:
+            Tavily extract response with the results and the failed_results
+        """
+        return await self._request(
+            "/extract", {"urls": urls, "extract_depth": "basic"}, hedge=False
+        )
+
+
+# One client per event loop, the pooled connections cannot be shared across loops
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncTavilyClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_tavily_client() -> AsyncTavilyClient:
+    """
+    Get the pooled Tavily client for the running event loop.
+
+    Returns:
+        Shared AsyncTavilyClient instance
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _clients:
+        _clients[loop] = AsyncTavilyClient()
+    return _clients[loop]
@@ -0,0 +1,61 @@
+import os
+import asyncio
+import weakref
+
+from src.metrics import increment
+
+# Maximum bytes of raw page content held at once by the researchers sharing a process
+# New searches wait while the cap is reached, until earlier pages are cleaned and released
+RAW_CONTENT_MEMORY_CAP_BYTES = int(os.getenv("RAW_CONTENT_MEMORY_CAP_BYTES", 64 * 1024 * 1024))
+
+
+class MemoryBudget:
+    """
+    Byte budget for raw page content shared by concurrent searches.
+
+    The cap is checked before a search starts, so it can be exceeded by the searches already
+    in flight but never grows further until content is released.
+    """
+
+    def __init__(self, cap: int):
+        self.cap = cap
+        self.used = 0
+        self._room = asyncio.Event()
+        self._room.set()
+
+    async def wait_for_room(self) -> None:
+        """Wait until the content held is below the cap."""
+        if not self._room.is_set():
+            increment("memory.raw_content_waits")
+        await self._room.wait()
+
+    def charge(self, size: int) -> None:
+        """Account for content that is now held in memory."""
+        self.used += size
+        if self.used >= self.cap:
+            self._room.clear()
+
+    def release(self, size: int) -> None:
+        """Account for content that has been dropped."""
+        self.used -= size
+        if self.used < self.cap:
+            self._room.set()
+
+
+# One budget per event loop, asyncio primitives cannot be shared across loops
+_budgets: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MemoryBudget]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_raw_content_budget() -> MemoryBudget:
+    """
+    Get the raw content budget for the running event loop.
+
+    Returns:
+        Shared MemoryBudget instance
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _budgets:
+        _budgets[loop] = MemoryBudget(RAW_CONTENT_MEMORY_CAP_BYTES)
+    return _budgets[loop]
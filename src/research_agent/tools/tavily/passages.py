@@ -0,0 +1,134 @@
+import re
+import math
+from collections import Counter
+from typing import List
+
+from src.metrics import increment
+from src.similarity import tokenize
+
+# Pages longer than this many words are cut down to their most relevant passages
+PASSAGE_SELECTION_MAX_WORDS = 1500
+
+# Passages are built from paragraphs up to roughly this many words
+PASSAGE_TARGET_WORDS = 120
+
+# Weight of the research topic relative to the search query when scoring passages
+TOPIC_WEIGHT = 0.5
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def split_passages(content: str) -> List[str]:
+    """
+    Split page content into passages of roughly PASSAGE_TARGET_WORDS words.
+
+    Short paragraphs are merged with their neighbours and long paragraphs are split on sentences.
+
+    Args:
+        content: Raw page content
+
+    Returns:
+        List of passages in page order
+    """
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", content):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph.split()) <= PASSAGE_TARGET_WORDS:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(re.split(r"(?<=[.!?])\s+", paragraph))
+
+    passages, current, current_words = [], [], 0
+    for piece in pieces:
+        words = len(piece.split())
+        if current and current_words + words > PASSAGE_TARGET_WORDS:
+            passages.append("\n".join(current))
+            current, current_words = [], 0
+        current.append(piece)
+        current_words += words
+    if current:
+        passages.append("\n".join(current))
+    return passages
+
+
+def bm25_scores(passages: List[List[str]], query: List[str]) -> List[float]:
+    """
+    Score tokenized passages against tokenized query terms with BM25.
+
+    Args:
+        passages: Tokenized passages
+        query: Tokenized query
+
+    Returns:
+        One score per passage
+    """
+    if not passages or not query:
+        return [0.0] * len(passages)
+
+    average_length = sum(len(p) for p in passages) / len(passages) or 1.0
+    document_frequency = Counter(term for p in passages for term in set(p))
+    n = len(passages)
+
+    scores = []
+    for passage in passages:
+        term_frequency = Counter(passage)
+        score = 0.0
+        for term in set(query):
+            tf = term_frequency.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (n - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            score += idf * tf * (BM25_K1 + 1) / (
+                tf + BM25_K1 * (1 - BM25_B + BM25_B * len(passage) / average_length)
+            )
+        scores.append(score)
+    return scores
+
+
+def select_passages(content: str, query: str = "", research_topic: str = "") -> str:
+    """
+    Keep only the passages of a page most relevant to the search query and research topic.
+
+    Runs locally without any model call. Pages under PASSAGE_SELECTION_MAX_WORDS words, or
+    calls without a query or topic, are returned unchanged. Selected passages keep page order.
+
+    Args:
+        content: Raw page content
+        query: Search query that returned the page
+        research_topic: Research topic of the researcher that issued the query
+
+    Returns:
+        The selected passages joined by blank lines
+    """
+    total_words = len(content.split())
+    if total_words <= PASSAGE_SELECTION_MAX_WORDS or not (query or research_topic):
+        return content
+
+    passages = split_passages(content)
+    tokenized = [tokenize(p) for p in passages]
+    query_scores = bm25_scores(tokenized, tokenize(query))
+    topic_scores = bm25_scores(tokenized, tokenize(research_topic))
+    scores = [q + TOPIC_WEIGHT * t for q, t in zip(query_scores, topic_scores)]
+
+    # Greedily take the best passages until the word budget is used
+    selected, used_words = set(), 0
+    for index in sorted(range(len(passages)), key=lambda i: scores[i], reverse=True):
+        words = len(passages[index].split())
+        if used_words + words > PASSAGE_SELECTION_MAX_WORDS:
+            continue
+        selected.add(index)
+        used_words += words
+
+    # A page made of a few huge passages falls back to its opening words
+    if not selected:
+        return " ".join(content.split()[:PASSAGE_SELECTION_MAX_WORDS])
+
+    increment("passages.words_in", total_words)
+    increment("passages.words_out", used_words)
+    print(f"Selected {len(selected)}/{len(passages)} passages ({used_words}/{total_words} words)")
+
+    return "\n\n".join(passages[i] for i in sorted(selected))
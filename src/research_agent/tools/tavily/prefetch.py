@@ -0,0 +1,162 @@
+import re
+import time
+import asyncio
+from typing import Dict, List, Literal, Optional, Tuple
+
+from src.metrics import increment, ratio
+from src.similarity import normalize_tokens, number_tokens, entity_tokens, containment
+from src.research_agent.tools.tavily.utils import search_and_summarize
+
+# How long a prefetched result can be served to a researcher before it is dropped
+PREFETCH_TTL_SECONDS = 15 * 60
+
+# Fraction of the researcher query keywords that must appear in a prefetched query to reuse it
+PREFETCH_MATCH_THRESHOLD = 0.6
+
+# Maximum number of words kept in a query derived from the research topic
+PREFETCH_QUERY_MAX_WORDS = 20
+
+# Prefetched searches keyed by the derived query: (keywords, launch time, search task)
+# Only touched from the event loop, so no locking is needed
+_prefetched: Dict[str, Tuple[frozenset, float, asyncio.Task]] = {}
+
+
+def derive_prefetch_queries(research_topic: str) -> List[str]:
+    """
+    Derive search queries from a research topic without calling a model.
+
+    The first sentence of a ConductResearch topic usually states the subject, which is
+    very close to the first query the researcher issues.
+
+    Args:
+        research_topic: Research topic paragraph from a ConductResearch call
+
+    Returns:
+        List of search queries to prefetch
+    """
+    first_sentence = re.split(r"(?<=[.?!])\s+", research_topic.strip(), maxsplit=1)[0]
+    # Drop the leading instruction ("Research the ...") which adds nothing to a web search
+    first_sentence = re.sub(
+        r"^(please\s+)?(research|investigate|find|identify|analyze|examine|explore)\s+(the\s+)?",
+        "",
+        first_sentence,
+        flags=re.IGNORECASE,
+    )
+    words = first_sentence.rstrip(".?!").split()[:PREFETCH_QUERY_MAX_WORDS]
+    query = " ".join(words)
+    return [query] if normalize_tokens(query) else []
+
+
+def _evict_expired() -> None:
+    """Drop prefetched results older than the TTL."""
+    now = time.monotonic()
+    for query in [q for q, (_, t, _) in _prefetched.items() if now - t > PREFETCH_TTL_SECONDS]:
+        _, _, task = _prefetched.pop(query)
+        task.cancel()
+
+
+def prefetch_search(
+    research_topic: str,
+    max_results: int = 3,
+    topic: Literal["general", "news", "finance"] = "general",
+) -> List[str]:
+    """
+    Start searches derived from a research topic in the background.
+
+    Searches run as background tasks so they overlap with the researcher's first model call.
+    Must be called from the event loop the researchers run on.
+
+    Args:
+        research_topic: Research topic paragraph from a ConductResearch call
+        max_results: Maximum number of results to return for each query
+        topic: Topic of the search
+
+    Returns:
+        The queries that were launched
+    """
+    launched = []
+    _evict_expired()
+    for query in derive_prefetch_queries(research_topic):
+        if query in _prefetched:
+            continue
+        task = asyncio.create_task(
+            search_and_summarize(
+                [query], max_results, topic, research_topic=research_topic
+            )
+        )
+        _prefetched[query] = (normalize_tokens(query), time.monotonic(), task)
+        launched.append(query)
+        increment("prefetch.launched")
+        print(f"Prefetching search for research topic: '{query}'")
+    return launched
+
+
+def claim_prefetched_search(query: str) -> Optional[Tuple[str, asyncio.Task]]:
+    """
+    Take the prefetched search matching a researcher query, without waiting for it.
+
+    A prefetched search matches when enough of the query keywords are covered by it, the figures
+    of both queries are the same and every name in the query appears in the prefetched query.
+    Each prefetched search is claimed at most once, later calls search again.
+
+    Args:
+        query: Search query issued by the researcher
+
+    Returns:
+        Tuple of the prefetched query and its search task, or None when nothing matches
+    """
+    keywords = normalize_tokens(query)
+    if not keywords:
+        return None
+
+    entities = entity_tokens(query)
+    match = None
+    _evict_expired()
+    best_score = 0.0
+    for prefetched_query, (prefetched_keywords, _, _) in _prefetched.items():
+        # "Tesla revenue 2023" or "BYD revenue 2024" must not get the Tesla 2024 results
+        if number_tokens(keywords) != number_tokens(prefetched_keywords):
+            continue
+        if not entities <= prefetched_keywords:
+            continue
+        score = containment(keywords, prefetched_keywords)
+        if score >= PREFETCH_MATCH_THRESHOLD and score > best_score:
+            best_score, match = score, prefetched_query
+
+    increment("prefetch.lookups")
+    if match is None:
+        return None
+    _, _, task = _prefetched.pop(match)
+    return match, task
+
+
+async def await_prefetched_search(query: str, claimed: Tuple[str, asyncio.Task]) -> Optional[Dict]:
+    """
+    Wait for a prefetched search claimed with claim_prefetched_search.
+
+    Args:
+        query: Search query issued by the researcher
+        claimed: Prefetched query and search task returned by claim_prefetched_search
+
+    Returns:
+        The summarized search results keyed by url, or None when the prefetched search failed
+    """
+    match, task = claimed
+    try:
+        result = await task
+    except Exception as e:
+        print(f"Prefetched search for '{match}' failed: {str(e)}")
+        increment("prefetch.errors")
+        return None
+
+    increment("prefetch.hits")
+    print(
+        f"Serving '{query}' from prefetched search '{match}' "
+        f"(hit rate {get_prefetch_hit_rate():.0%})"
+    )
+    return result
+
+
+def get_prefetch_hit_rate() -> float:
+    """Fraction of launched prefetches that were served to a researcher."""
+    return ratio("prefetch.hits", "prefetch.launched")
@@ -8,7 +8,7 @@ Here is the raw content of the webpage:
 <webpage_content>
 {webpage_content}
 </webpage_content>
-
+{search_context}
 Please follow these guidelines to create your summary:
 
 1. Identify and preserve the main topic or purpose of the webpage.
@@ -59,4 +59,13 @@ Example 2 (for a scientific article):
 Remember, your goal is to create a summary that can be easily understood and utilized by a downstream research agent while preserving the most critical information from the original webpage.
 
 Today's date is {date}.
-"""
\ No newline at end of file
+"""
+
+
+SEARCH_CONTEXT_PROMPT = """
+This page was returned for the search query "{query}" while researching the following topic:
+<research_topic>
+{research_topic}
+</research_topic>
+If the page was long, the content above has been reduced to the passages most relevant to this query and topic. Prioritize information that helps answer them.
+"""
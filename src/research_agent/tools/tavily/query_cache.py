@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import asyncio
+from typing import Dict, Optional, Tuple
+
+from src.metrics import increment
+from src.similarity import normalize_tokens, number_tokens, jaccard
+
+# Queries whose normalized words have at least this Jaccard similarity share a result set
+# Queries with different figures (e.g. years) never share one, whatever their similarity
+QUERY_SIMILARITY_THRESHOLD = 0.8
+
+# How long a result set can be reused within a run
+QUERY_CACHE_TTL_SECONDS = 30 * 60
+
+# Maximum number of result sets kept in memory, the oldest are dropped first
+QUERY_CACHE_MAX_ENTRIES = 500
+
+# Also reuse result sets across runs through a persistent cache
+QUERY_CACHE_PERSISTENT = False
+QUERY_CACHE_PERSISTENT_TTL_SECONDS = 24 * 3600
+QUERY_CACHE_DB = os.getenv("QUERY_CACHE_DB", ".cache/query_cache.sqlite")
+
+# Result sets keyed by the exact query: (normalized words, search options, stored at, compressed response)
+# Responses are kept zlib-compressed, raw page content makes up most of their size
+_entries: Dict[str, Tuple[frozenset, Tuple, float, bytes]] = {}
+
+# Searches in flight keyed by normalized words and options, so concurrent duplicates share one request
+_in_flight: Dict[Tuple, asyncio.Future] = {}
+
+# Search options whose persistent entries have already been loaded into memory
+_persistent_loaded: set = set()
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the persistent query cache, creating the table on first use."""
+    os.makedirs(os.path.dirname(QUERY_CACHE_DB) or ".", exist_ok=True)
+    connection = sqlite3.connect(QUERY_CACHE_DB, timeout=30)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS queries ("
+        "query TEXT PRIMARY KEY, options TEXT, stored_at REAL, response BLOB)"
+    )
+    return connection
+
+
+def _load_persistent(options: Tuple) -> None:
+    """Load fresh entries from the persistent cache into memory, once per process."""
+    if options in _persistent_loaded:
+        return
+    _persistent_loaded.add(options)
+    min_stored_at = time.time() - QUERY_CACHE_PERSISTENT_TTL_SECONDS
+    with _connect() as connection:
+        rows = connection.execute(
+            "SELECT query, stored_at, response FROM queries WHERE options = ? AND stored_at >= ?",
+            (json.dumps(options), min_stored_at),
+        ).fetchall()
+    connection.close()
+    for query, stored_at, response in rows:
+        if query not in _entries:
+            _entries[query] = (
+                normalize_tokens(query),
+                options,
+                stored_at,
+                response,
+            )
+
+
+def _compress(response: Dict) -> bytes:
+    """Serialize and compress a response for storage."""
+    return zlib.compress(json.dumps(response).encode())
+
+
+def _copy_response(response: Dict) -> Dict:
+    """
+    Copy of a response whose results can be modified without affecting other callers.
+
+    The search pipeline pops raw content from results once it is processed.
+    """
+    return {**response, "results": [dict(result) for result in response.get("results", [])]}
+
+
+def _store_persistent(query: str, options: Tuple, compressed: bytes) -> None:
+    """Write a compressed result set to the persistent cache."""
+    with _connect() as connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO queries (query, options, stored_at, response) VALUES (?, ?, ?, ?)",
+            (query, json.dumps(options), time.time(), compressed),
+        )
+    connection.close()
+
+
+def find_similar(query: str, options: Tuple) -> Optional[Dict]:
+    """
+    Find a cached result set for a near-duplicate of the query.
+
+    Word order, stop words and plurals are trivial differences, a different number is not.
+
+    Args:
+        query: Search query
+        options: Search options (max_results, topic, include_raw_content) that must match exactly
+
+    Returns:
+        A fresh copy of the cached Tavily response, or None when no stored query is similar enough
+    """
+    if QUERY_CACHE_PERSISTENT:
+        _load_persistent(options)
+
+    tokens = normalize_tokens(query)
+    ttl = QUERY_CACHE_PERSISTENT_TTL_SECONDS if QUERY_CACHE_PERSISTENT else QUERY_CACHE_TTL_SECONDS
+    now = time.time()
+
+    best_query, best_score = None, 0.0
+    for cached_query, (cached_tokens, cached_options, stored_at, _) in list(_entries.items()):
+        if now - stored_at > ttl:
+            del _entries[cached_query]
+            continue
+        if cached_options != options:
+            continue
+        if cached_query == query:
+            score = 1.0
+        elif number_tokens(tokens) != number_tokens(cached_tokens):
+            continue
+        else:
+            score = jaccard(tokens, cached_tokens)
+        if score >= QUERY_SIMILARITY_THRESHOLD and score > best_score:
+            best_query, best_score = cached_query, score
+
+    if best_query is None:
+        return None
+
+    if best_query != query:
+        print(
+            f"Query '{query}' matched cached query '{best_query}' (similarity {best_score:.2f})"
+        )
+    return json.loads(zlib.decompress(_entries[best_query][3]))
+
+
+async def cached_search(query: str, options: Tuple, search) -> Dict:
+    """
+    Serve a search from the cache of near-duplicate queries, searching only on a miss.
+
+    Args:
+        query: Search query
+        options: Search options (max_results, topic, include_raw_content)
+        search: Coroutine function running the actual search for the query
+
+    Returns:
+        Tavily search response
+    """
+    cached = find_similar(query, options)
+    if cached is not None:
+        increment("query_cache.hits")
+        return cached
+
+    # Identical queries issued concurrently share one request
+    key = (normalize_tokens(query), options)
+    if key in _in_flight:
+        increment("query_cache.hits")
+        return _copy_response(await asyncio.shield(_in_flight[key]))
+
+    increment("query_cache.misses")
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[key] = future
+    try:
+        response = await search(query)
+        # Failed searches are not cached so the next attempt tries again
+        if not response.get("error"):
+            compressed = _compress(response)
+            _entries[query] = (normalize_tokens(query), options, time.time(), compressed)
+            while len(_entries) > QUERY_CACHE_MAX_ENTRIES:
+                del _entries[next(iter(_entries))]
+            if QUERY_CACHE_PERSISTENT:
+                await asyncio.to_thread(_store_persistent, query, options, compressed)
+        # Waiting duplicates each copy the shared result, the caller keeps the original
+        future.set_result(_copy_response(response))
+        return response
+    except BaseException as e:
+        # Concurrent duplicates get the same empty result a failed search produces
+        future.set_result({"results": [], "query": query, "error": str(e)})
+        raise
+    finally:
+        del _in_flight[key]
@@ -1,58 +1,92 @@
 import os
+import asyncio
 from dotenv import load_dotenv
-from typing import Annotated, List, Dict, Literal
+from typing import Annotated, List, Dict, Literal, Tuple
 from src.research_agent.tools.tavily.utils import (
-    tavily_search_multiple,
-    deduplicate_search_results,
-    process_search_results,
+    search_and_summarize,
     format_search_results,
+    build_source_table,
+)
+from src.research_agent.tools.tavily.prefetch import (
+    claim_prefetched_search,
+    await_prefetched_search,
 )
 from langchain_core.tools import tool, InjectedToolArg
 
 load_dotenv(override=True)
 
 
-@tool(parse_docstring=True)
-def tavily_search(
-    query: str,
+@tool(parse_docstring=True, response_format="content_and_artifact")
+async def tavily_search(
+    queries: List[str],
     max_results: Annotated[int, InjectedToolArg] = 3,
     topic: Annotated[
         Literal["general", "news", "finance"], InjectedToolArg
     ] = "general",
-) -> str:
+    research_topic: Annotated[str, InjectedToolArg] = "",
+) -> Tuple[str, Dict]:
     """
-    Perform search using tavily client api for a single query.
+    Perform search using tavily client api for one or more queries.
+
+    Use several queries to cover different angles of a question in one call.
+    The queries run concurrently and their results are deduplicated and combined.
+    Each source is labelled with a short id such as [S3f9a2c], cite sources by that id.
 
     Args:
-        query: A Single search query to execute
-        max_results: Maximum number of results to return
+        queries: List of search queries to execute
+        max_results: Maximum number of results to return for each query
         topic: Topic of to filter results by ("general", "news", "finance")
+        research_topic: Research topic of the calling researcher, used to focus the summaries
 
     Returns:
-        Formatted string of search results with summaries
+        Formatted string of search results with summaries, and the source table entries as artifact
     """
     try:
-        print(f"Starting Tavily search for query: '{query}'")
+        print(f"Starting Tavily search for queries: {queries}")
+
+        async def search(search_queries: List[str], exclude_urls=()) -> Dict:
+            if not search_queries:
+                return {}
+            return await search_and_summarize(
+                search_queries,
+                max_results=max_results,
+                topic=topic,
+                exclude_urls=exclude_urls,
+                research_topic=research_topic,
+            )
 
-        # Execute search for a single query
-        search_result = tavily_search_multiple(
-            [query], max_results=max_results, topic=topic, include_raw_content=True
+        # Serve queries from searches prefetched when the research unit was launched
+        claims = [(query, claim_prefetched_search(query)) for query in queries]
+        prefetched = [(query, claimed) for query, claimed in claims if claimed is not None]
+        remaining_queries = [query for query, claimed in claims if claimed is None]
+
+        # Wait for the prefetched searches while the remaining searches run
+        searched_results, *prefetched_results = await asyncio.gather(
+            search(remaining_queries),
+            *(await_prefetched_search(query, claimed) for query, claimed in prefetched),
         )
 
-        # Deduplicate result by url to avoid processing duplicate context
-        unique_results = deduplicate_search_results(search_result)
-        print(f"Found {len(unique_results)} unique results")
+        summarized_results: Dict = {}
+        for results in prefetched_results:
+            summarized_results.update(results or {})
+        for url, result in searched_results.items():
+            summarized_results.setdefault(url, result)
 
-        # Process the results for summarization
-        summarized_results = process_search_results(unique_results)
+        # Queries whose prefetched search failed are searched now, skipping pages already summarized
+        failed_queries = [
+            query for (query, _), results in zip(prefetched, prefetched_results) if results is None
+        ]
+        summarized_results.update(
+            await search(failed_queries, exclude_urls=summarized_results.keys())
+        )
 
         # Format output for consumption by the research agent
         formatted_output = format_search_results(summarized_results)
 
         print("Tavily search completed successfully")
-        return formatted_output
+        return formatted_output, build_source_table(summarized_results)
 
     except Exception as e:
-        error_msg = f"Error during Tavily search for query '{query}': {str(e)}"
+        error_msg = f"Error during Tavily search for queries {queries}: {str(e)}"
         print(error_msg)
-        return error_msg
+        return error_msg, {}
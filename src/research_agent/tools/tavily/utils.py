@@ -1,24 +1,68 @@
-import os
+import time
 import asyncio
+from datetime import datetime, timezone
 from dotenv import load_dotenv
-from typing import List, Dict, Literal
-from tavily import TavilyClient
+from typing import Callable, Iterable, List, Dict, Literal, Optional
 from langchain.chat_models import init_chat_model
 from src.research_agent.schema import Summary
-from src.research_agent.tools.tavily.prompt import SUMMARIZE_WEBPAGE_CONTENT_PROMPT
+from src.metrics import increment, record_peak_rss
+from src.research_agent.tools.tavily.prompt import (
+    SUMMARIZE_WEBPAGE_CONTENT_PROMPT,
+    SEARCH_CONTEXT_PROMPT,
+)
+from src.research_agent.tools.tavily.passages import select_passages
+from src.research_agent.tools.tavily.cleaning import clean_raw_content
+from src.research_agent.tools.tavily.client import get_tavily_client, EXTRACT_MAX_URLS
+from src.research_agent.tools.tavily.adaptive import (
+    ADAPTIVE_SEARCH_ENABLED,
+    ADAPTIVE_MIN_RESULTS_PER_QUERY,
+    ADAPTIVE_MAX_RESULTS,
+    prune_results,
+)
+from src.research_agent.tools.tavily.cascade import SUMMARY_CASCADE_ENABLED, summary_tier
+from src.research_agent.tools.tavily.query_cache import cached_search
+from src.research_agent.tools.tavily.memory_budget import get_raw_content_budget
+from src.research_agent.tools.local_corpus.index import index_page
 from src.utils import get_today_str
+from src.sources import Source, source_id
+from src.llm import resilient
 
 load_dotenv(override=True)
 
-tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
-
 llm = init_chat_model(model="gpt-4o", temperature=0, timeout=60)
 
-summarization_model = llm.with_structured_output(Summary)
+# Small fast model for medium pages of the summarization cascade
+fast_llm = init_chat_model(model="gpt-4.1-mini", temperature=0, timeout=60)
+
+# Map near-duplicate queries to an existing result set instead of searching again
+QUERY_CACHE_ENABLED = True
+
+# Store every summarized page in the local full-text corpus searched by local_search
+LOCAL_CORPUS_INDEXING = True
+
+# Summarize pages as soon as their query returns instead of waiting for every query
+PIPELINED_SEARCH = True
+
+# Pages found but not yet picked up by a summarizer, searches wait while the queue is full
+PIPELINE_QUEUE_SIZE = 8
+
+# Pages summarized concurrently by one search_and_summarize call
+PIPELINE_SUMMARIZERS = 8
+
+# Structured outputs include the raw message so token usage is counted per model
+summarization_model = resilient(
+    llm.with_structured_output(Summary, include_raw=True), name="summarize_webpage", timeout=60
+)
+
+fast_summarization_model = resilient(
+    fast_llm.with_structured_output(Summary, include_raw=True),
+    name="summarize_webpage_fast",
+    timeout=60,
+)
 
 
 ## Multiple queries search using tavily client
-def tavily_search_multiple(
+async def tavily_search_multiple(
     search_queries: List[str],
     max_results: int = 3,
     topic: Literal["general", "news", "finance"] = "general",
@@ -36,29 +80,165 @@ def tavily_search_multiple(
     Returns:
         List of search results
     """
-    results = []
-    for query in search_queries:
+    tavily_client = get_tavily_client()
+
+    async def search(query: str) -> Dict:
         try:
             print(f"Searching for: {query}")
-            result = tavily_client.search(
+            result = await tavily_client.search(
                 query,
                 max_results=max_results,
                 topic=topic,
                 include_raw_content=include_raw_content,
             )
-            results.append(result)
             print(f"Found {len(result.get('results', []))} results for query: {query}")
+            return result
         except Exception as e:
             print(f"Error searching for query '{query}': {str(e)}")
+            increment("search.errors")
             # Add empty result to maintain structure
-            results.append({"results": [], "query": query, "error": str(e)})
-    return results
+            return {"results": [], "query": query, "error": str(e)}
+
+    if QUERY_CACHE_ENABLED:
+        options = (max_results, topic, include_raw_content)
+        searches = [cached_search(query, options, search) for query in search_queries]
+    else:
+        searches = [search(query) for query in search_queries]
+
+    # Run the queries concurrently, results keep the order of the queries
+    return await asyncio.gather(*searches)
+
+
+async def fetch_raw_content(urls: List[str]) -> Dict[str, str]:
+    """
+    Pull the raw content of pages with Tavily extract, in batches run concurrently.
+
+    Args:
+        urls: Urls of the pages
+
+    Returns:
+        Dictionary of url to raw content, pages that failed are missing
+    """
+    tavily_client = get_tavily_client()
+
+    async def extract(batch: List[str]) -> Dict[str, str]:
+        try:
+            response = await tavily_client.extract(batch)
+        except Exception as e:
+            print(f"Error extracting {len(batch)} pages: {str(e)}")
+            increment("search.extract_errors")
+            return {}
+        return {
+            result["url"]: result["raw_content"]
+            for result in response.get("results", [])
+            if result.get("raw_content")
+        }
+
+    batches = await asyncio.gather(
+        *(
+            extract(urls[i:i + EXTRACT_MAX_URLS])
+            for i in range(0, len(urls), EXTRACT_MAX_URLS)
+        )
+    )
+    return {url: content for batch in batches for url, content in batch.items()}
+
+
+async def adaptive_search(
+    query: str,
+    max_results: int = 3,
+    topic: Literal["general", "news", "finance"] = "general",
+    research_topic: str = "",
+) -> Dict:
+    """
+    Search a query without raw content and prune the weak results.
+
+    A query left with too few relevant results is searched once more with more results.
+    Results below the Tavily score or snippet relevance thresholds never reach the summarizer.
+
+    Args:
+        query: Search query to perform
+        max_results: Maximum number of results to return
+        topic: Topic of the search
+        research_topic: Research topic of the researcher, used to judge snippet relevance
+
+    Returns:
+        Search response holding only the kept results, without raw content
+    """
+    [response] = await tavily_search_multiple(
+        [query], max_results=max_results, topic=topic, include_raw_content=False
+    )
+    kept = prune_results(response, research_topic)
+
+    # Widen the query when its coverage is thin
+    wider_max_results = min(max_results * 2, ADAPTIVE_MAX_RESULTS)
+    if len(kept) < ADAPTIVE_MIN_RESULTS_PER_QUERY and wider_max_results > max_results:
+        increment("search.widened_queries")
+        [response] = await tavily_search_multiple(
+            [query], max_results=wider_max_results, topic=topic, include_raw_content=False
+        )
+        kept = prune_results(response, research_topic)
+
+    total = len(response.get("results", []))
+    increment("search.results_seen", total)
+    increment("search.results_pruned", total - len(kept))
+    print(f"Kept {len(kept)}/{total} search results for query: {query}")
+
+    return {**response, "results": kept}
+
+
+async def adaptive_search_multiple(
+    search_queries: List[str],
+    max_results: int = 3,
+    topic: Literal["general", "news", "finance"] = "general",
+    research_topic: str = "",
+    exclude_urls: Iterable[str] = (),
+) -> List[Dict]:
+    """
+    Search without raw content, prune weak results and pull raw content only for the rest.
+
+    Args:
+        search_queries: List of search queries to perform
+        max_results: Maximum number of results to return for each query
+        topic: Topic of the search
+        research_topic: Research topic of the researcher, used to judge snippet relevance
+        exclude_urls: Urls that are already covered and whose content is not pulled
+
+    Returns:
+        List of search responses holding only the kept results, with raw content where it was pulled
+    """
+    responses = await asyncio.gather(
+        *(adaptive_search(query, max_results, topic, research_topic) for query in search_queries)
+    )
+
+    # Pull the raw content of the kept pages, each page once
+    excluded = set(exclude_urls)
+    urls = list(dict.fromkeys(
+        result["url"]
+        for response in responses
+        for result in response["results"]
+        if result["url"] not in excluded
+    ))
+    raw_contents = await fetch_raw_content(urls) if urls else {}
+
+    return [
+        {
+            **response,
+            "results": [
+                {**result, "raw_content": raw_contents.get(result["url"])}
+                for result in response["results"]
+            ],
+        }
+        for response in responses
+    ]
 
 
 def deduplicate_search_results(search_results: List[Dict]) -> dict:
     """
     Deduplicate the search result by url to avoid processing duplicate content.
 
+    Raw content is moved out of the search responses, so duplicate pages are released
+    as soon as the responses are dropped.
+
     Args:
         search_results: List of search results dictionaries
 
@@ -73,27 +253,55 @@ def deduplicate_search_results(search_results: List[Dict]) -> dict:
         for result in response["results"]:
             url = result["url"]
             if url not in unique_results:
-                unique_results[url] = result
+                # Remember which query found the page, it guides passage selection
+                unique_results[url] = {**result, "query": response.get("query", "")}
+            result.pop("raw_content", None)
 
     return unique_results
 
 
-def summarize_webpage_content(webpage_content: str) -> str:
+async def summarize_webpage_content(
+    webpage_content: str, query: str = "", research_topic: str = ""
+) -> str:
     """
     Summarize webpage content using the configured summarization model.
 
+    Only the passages most relevant to the query and research topic are sent to the model.
+    With the summarization cascade, short pages are used as they are, medium pages go to the
+    fast model and long or dense pages to the large model.
+
     Args:
         webpage_content: Raw content of the webpage
+        query: Search query that returned the page
+        research_topic: Research topic of the researcher that issued the query
 
     Returns:
         Summarized content of the webpage
     """
+    tier = summary_tier(webpage_content) if SUMMARY_CASCADE_ENABLED else "long"
+    increment(f"summarize.{tier}.pages")
+    start = time.monotonic()
     try:
-        print("Starting webpage content summarization...")
+        # Short pages are already small enough for the researcher to read as they are
+        if tier == "short":
+            return f"<summary> \n{webpage_content.strip()}\n </summary>\n\n"
+
+        print(f"Starting webpage content summarization ({tier} page)...")
+
+        # Keep only the passages relevant to the query and topic, locally and without a model call
+        selected_content = select_passages(webpage_content, query, research_topic)
+
+        search_context = (
+            SEARCH_CONTEXT_PROMPT.format(query=query, research_topic=research_topic)
+            if query or research_topic
+            else ""
+        )
 
         # Format the system instruction with the current date and the webpage content
         system_instruction = SUMMARIZE_WEBPAGE_CONTENT_PROMPT.format(
-            date=get_today_str(), webpage_content=webpage_content
+            date=get_today_str(),
+            webpage_content=selected_content,
+            search_context=search_context,
         )
 
         # Prepare the messages for the summarization model
@@ -104,7 +312,11 @@ def summarize_webpage_content(webpage_content: str) -> str:
 
         # Generate the summary with timeout
         print("Calling summarization model...")
-        summary = summarization_model.invoke(messages)
+        model = fast_summarization_model if tier == "medium" else summarization_model
+        response = await model.ainvoke(messages)
+        summary = response["parsed"]
+        if summary is None:
+            raise ValueError(f"Invalid summary: {response['parsing_error']}")
 
         # Format summary with clear structure
         formatted_summary = (
@@ -121,29 +333,95 @@ def summarize_webpage_content(webpage_content: str) -> str:
     except Exception as e:
         print(f"Error during summarization: {str(e)}")
         return f"Error summarizing content: {str(e)}"
+    finally:
+        increment(f"summarize.{tier}.seconds", time.monotonic() - start)
 
 
-def process_search_results(unique_results: Dict) -> Dict:
+async def process_search_result(
+    result: Dict,
+    research_topic: str = "",
+    on_release: Optional[Callable[[int], None]] = None,
+) -> str:
+    """
+    Clean, summarize and index a single search result.
+
+    The raw content is popped from the result and dropped as soon as it has been cleaned.
+
+    Args:
+        result: Search result, with the query that found it
+        research_topic: Research topic of the researcher that issued the query
+        on_release: Called with the size of the raw page once it is dropped
+
+    Returns:
+        Summary of the page, or its snippet when there is no raw content to summarize
+    """
+    # Use existing content if no raw content for summarization
+    raw_content = result.pop("raw_content", None)
+    if not raw_content:
+        return result["content"]
+    raw_size = len(raw_content)
+    # Strip boilerplate locally so we don't pay to summarize it
+    # Rebinding raw_content drops the last reference to the raw page
+    try:
+        raw_content, stats = clean_raw_content(raw_content)
+    finally:
+        if on_release:
+            on_release(raw_size)
+    print(
+        f"Cleaned {result['url']}: removed {stats['bytes_in'] - stats['bytes_out']} bytes "
+        f"(~{stats['tokens_removed']} tokens)"
+    )
+    if not raw_content:
+        return result["content"]
+
+    # Summarize raw content for better processing
+    summary = await summarize_webpage_content(
+        raw_content, result.get("query", ""), research_topic
+    )
+    # Keep the page and its summary in the local corpus for later research
+    if LOCAL_CORPUS_INDEXING and not summary.startswith("Error summarizing"):
+        try:
+            await asyncio.to_thread(
+                index_page,
+                result["url"],
+                result.get("title", ""),
+                raw_content,
+                summary,
+            )
+        except Exception as e:
+            print(f"Error indexing page '{result['url']}': {str(e)}")
+    return summary
+
+
+async def process_search_results(
+    unique_results: Dict,
+    research_topic: str = "",
+    on_release: Optional[Callable[[int], None]] = None,
+) -> Dict:
     """
     Process the search results by summarizing content where available.
 
+    Pages are summarized concurrently. The raw content of each page is dropped from
+    unique_results as soon as it has been cleaned.
+
     Args:
         unique_results: Dictionary of unique search results
+        research_topic: Research topic of the researcher that issued the queries
+        on_release: Called with the size of each raw page once it is dropped
 
     Returns:
         Dictionary of processed results with summaries
     """
+    contents = await asyncio.gather(
+        *(
+            process_search_result(result, research_topic, on_release)
+            for result in unique_results.values()
+        )
+    )
 
     summarized_results = {}
 
-    for url, result in unique_results.items():
-        # Use existing content if no raw content for summarization
-        if not result.get("raw_content"):
-            content = result["content"]
-        else:
-            # Summarize raw content for better processing
-            content = summarize_webpage_content(result["raw_content"])
-
+    for (url, result), content in zip(unique_results.items(), contents):
         summarized_results[url] = {
             "title": result.get("title", ""),
             "content": content,
@@ -168,10 +446,188 @@ def format_search_results(summarized_results: Dict) -> str:
     formatted_results = " Search results:\n\n "
 
     # Format the results into a well structured string output
-    for i, (url, result) in enumerate(summarized_results.items(), 1):
-        formatted_results += f"\n\n--- SOURCE {i}: {result['title']} ---\n"
-        formatted_results += f"URL: {url}\n\n"
+    # Sources are referenced by their compact id, urls live in the run-wide source table
+    for url, result in summarized_results.items():
+        formatted_results += f"\n\n--- SOURCE [{source_id(url)}]: {result['title']} ---\n"
+        # Pages from the local corpus carry their fetch time, so the agent can judge if they are out of date
+        if result.get("fetched_at"):
+            fetched = datetime.fromtimestamp(result["fetched_at"], tz=timezone.utc)
+            formatted_results += f"FETCHED: {fetched:%Y-%m-%d}\n"
         formatted_results += f"SUMMARY:\n{result['content']}\n\n"
         formatted_results += "-" * 100 + "\n"
 
     return formatted_results
+
+
+def build_source_table(summarized_results: Dict) -> Dict[str, Source]:
+    """
+    Build the source table entries for a set of summarized search results.
+
+    Args:
+        summarized_results: Dictionary of summarized search results keyed by url
+
+    Returns:
+        Dictionary of source id to url and title
+    """
+    return {
+        source_id(url): {"url": url, "title": result.get("title", "")}
+        for url, result in summarized_results.items()
+    }
+
+
+async def pipelined_search_and_summarize(
+    search_queries: List[str],
+    max_results: int = 3,
+    topic: Literal["general", "news", "finance"] = "general",
+    exclude_urls: Iterable[str] = (),
+    research_topic: str = "",
+) -> Dict:
+    """
+    Search and summarize as a pipeline, pages are summarized while other queries are still searching.
+
+    Each query feeds its pages into a bounded queue drained by a pool of summarizers.
+    A page is claimed by the first query that returns it, so duplicates are dropped as
+    results arrive. The queue applies backpressure: searches wait while it is full.
+
+    Args:
+        search_queries: List of search queries to perform
+        max_results: Maximum number of results to return for each query
+        topic: Topic of the search
+        exclude_urls: Urls that are already covered and should not be summarized again
+        research_topic: Research topic of the researcher, used to focus the summaries
+
+    Returns:
+        Dictionary of processed results with summaries keyed by url, in query and ranking order
+    """
+    budget = get_raw_content_budget()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    claimed = set(exclude_urls)
+    summaries = {}
+    charged = 0
+
+    def release(size: int):
+        nonlocal charged
+        charged -= size
+        budget.release(size)
+
+    async def produce(query_index: int, query: str):
+        nonlocal charged
+        if ADAPTIVE_SEARCH_ENABLED:
+            response = await adaptive_search(query, max_results, topic, research_topic)
+        else:
+            [response] = await tavily_search_multiple(
+                [query], max_results=max_results, topic=topic, include_raw_content=True
+            )
+
+        # Claim the pages no other query has returned yet
+        new_results = []
+        for rank, result in enumerate(response["results"]):
+            raw_content = result.pop("raw_content", None)
+            if result["url"] in claimed:
+                continue
+            claimed.add(result["url"])
+            new_results.append((rank, {**result, "query": query, "raw_content": raw_content}))
+
+        # Pull the raw content only for the pages this query claimed
+        if ADAPTIVE_SEARCH_ENABLED and new_results:
+            raw_contents = await fetch_raw_content([result["url"] for _, result in new_results])
+            for _, result in new_results:
+                result["raw_content"] = raw_contents.get(result["url"])
+
+        for rank, result in new_results:
+            # Raw content stays charged to the budget until the page is cleaned
+            size = len(result.get("raw_content") or "")
+            charged += size
+            budget.charge(size)
+            await queue.put(((query_index, rank), result))
+
+    async def consume():
+        while (item := await queue.get()) is not None:
+            key, result = item
+            content = await process_search_result(result, research_topic, release)
+            summaries[key] = (result["url"], result.get("title", ""), content)
+
+    try:
+        async with asyncio.TaskGroup() as task_group:
+            summarizers = [task_group.create_task(consume()) for _ in range(PIPELINE_SUMMARIZERS)]
+            await asyncio.gather(
+                *(produce(query_index, query) for query_index, query in enumerate(search_queries))
+            )
+            for _ in summarizers:
+                await queue.put(None)
+    finally:
+        budget.release(charged)
+        record_peak_rss()
+
+    print(f"Found {len(summaries)} unique results")
+    return {
+        url: {"title": title, "content": content}
+        for url, title, content in (summaries[key] for key in sorted(summaries))
+    }
+
+
+async def search_and_summarize(
+    search_queries: List[str],
+    max_results: int = 3,
+    topic: Literal["general", "news", "finance"] = "general",
+    exclude_urls: Iterable[str] = (),
+    research_topic: str = "",
+) -> Dict:
+    """
+    Run the search pipeline for a set of queries: search, deduplicate and summarize.
+
+    Args:
+        search_queries: List of search queries to perform
+        max_results: Maximum number of results to return for each query
+        topic: Topic of the search
+        exclude_urls: Urls that are already covered and should not be summarized again
+        research_topic: Research topic of the researcher, used to focus the summaries
+
+    Returns:
+        Dictionary of processed results with summaries keyed by url
+    """
+    # Wait while the researchers of this process already hold too much raw content
+    budget = get_raw_content_budget()
+    await budget.wait_for_room()
+
+    if PIPELINED_SEARCH:
+        return await pipelined_search_and_summarize(
+            search_queries, max_results, topic, exclude_urls, research_topic
+        )
+
+    # Execute the searches concurrently
+    if ADAPTIVE_SEARCH_ENABLED:
+        search_result = await adaptive_search_multiple(
+            search_queries,
+            max_results=max_results,
+            topic=topic,
+            research_topic=research_topic,
+            exclude_urls=exclude_urls,
+        )
+    else:
+        search_result = await tavily_search_multiple(
+            search_queries, max_results=max_results, topic=topic, include_raw_content=True
+        )
+
+    # Deduplicate result by url across all queries to avoid processing duplicate context
+    unique_results = deduplicate_search_results(search_result)
+    del search_result
+    for url in exclude_urls:
+        unique_results.pop(url, None)
+    print(f"Found {len(unique_results)} unique results")
+
+    # Raw content stays charged to the budget until each page is cleaned
+    charged = sum(len(result.get("raw_content") or "") for result in unique_results.values())
+    budget.charge(charged)
+
+    def release(size: int):
+        nonlocal charged
+        charged -= size
+        budget.release(size)
+
+    # Process the results for summarization
+    try:
+        return await process_search_results(unique_results, research_topic, release)
+    finally:
+        budget.release(charged)
+        record_peak_rss()
@@ -1,4 +1,7 @@
+from typing import List, Tuple
 from langchain_core.tools import tool
+from langchain_core.messages import ToolCall, ToolMessage
+from src.metrics import increment
 
 
 @tool(parse_docstring=True)
@@ -25,3 +28,44 @@ def think_tool(reflection: str) -> str:
         reflection: Your detailed reflection on research progress, findings, gaps and next steps.
     """
     return f"Reflection recorded: {reflection}"
+
+
+# Record reflections emitted alongside other tool calls without running the tool, and ask the
+# models to reflect in the same turn as their next action instead of in a turn of its own
+INLINE_REFLECTION = True
+
+
+def split_inline_reflections(
+    tool_calls: List[ToolCall],
+) -> Tuple[List[ToolMessage], List[str], List[ToolCall]]:
+    """
+    Handle think_tool calls made in the same model turn as other tool calls.
+
+    Such reflections are recorded directly and answered with a short ToolMessage, so they never
+    cost a model round trip of their own. Turns with only think_tool calls are left unchanged.
+
+    Args:
+        tool_calls: Tool calls of a model turn
+
+    Returns:
+        Tuple of the ToolMessages answering the reflections, the recorded reflections,
+        and the tool calls still to execute
+    """
+    think_calls = [c for c in tool_calls if c["name"] == think_tool.name]
+    other_calls = [c for c in tool_calls if c["name"] != think_tool.name]
+
+    if not think_calls:
+        return [], [], tool_calls
+    if not other_calls:
+        increment("think.standalone_turns")
+        return [], [], tool_calls
+    if not INLINE_REFLECTION:
+        return [], [], tool_calls
+
+    increment("think.turns_saved")
+    messages = [
+        ToolMessage(content="Reflection recorded.", tool_call_id=c["id"], name=c["name"])
+        for c in think_calls
+    ]
+    reflections = [c["args"].get("reflection", "") for c in think_calls]
+    return messages, reflections, other_calls
@@ -0,0 +1,81 @@
+import os
+import json
+import time
+import sqlite3
+from typing import Dict, Optional
+
+from src.metrics import increment
+from src.similarity import tokenize
+
+# Serve repeated research briefs from earlier runs instead of researching them again
+RUN_CACHE_ENABLED = True
+
+# How long the research of an earlier run can be reused
+RUN_CACHE_TTL_SECONDS = 24 * 3600
+
+# Also reuse the cached final report, otherwise only the research is reused and the report is rewritten
+RUN_CACHE_REUSE_REPORT = True
+
+RUN_CACHE_DB = os.getenv("RUN_CACHE_DB", ".cache/run_cache.sqlite")
+
+
+def normalize_brief(research_brief: str) -> str:
+    """Canonical form of a research brief: content words in order, casing and spelling normalized."""
+    return " ".join(tokenize(research_brief))
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the run cache, creating the table on first use."""
+    os.makedirs(os.path.dirname(RUN_CACHE_DB) or ".", exist_ok=True)
+    connection = sqlite3.connect(RUN_CACHE_DB, timeout=30)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS runs (brief TEXT PRIMARY KEY, stored_at REAL, result TEXT)"
+    )
+    return connection
+
+
+def find_run(research_brief: str) -> Optional[Dict]:
+    """
+    Find a fresh run for the same research brief.
+
+    Briefs only match when their normalized forms are identical, a brief differing in any content
+    word (a country, a year) never gets another brief's report.
+
+    Args:
+        research_brief: Brief written by the scoping phase
+
+    Returns:
+        Dict with notes, raw_notes, sources, final_report and report_with_source_ids,
+        or None when no fresh run matches
+    """
+    min_stored_at = time.time() - RUN_CACHE_TTL_SECONDS
+    with _connect() as connection:
+        row = connection.execute(
+            "SELECT result FROM runs WHERE brief = ? AND stored_at >= ?",
+            (normalize_brief(research_brief), min_stored_at),
+        ).fetchone()
+    connection.close()
+
+    if row is None:
+        increment("run_cache.misses")
+        return None
+
+    increment("run_cache.hits")
+    print("Reusing an earlier run for this research brief")
+    return json.loads(row[0])
+
+
+def store_run(research_brief: str, result: Dict) -> None:
+    """
+    Remember the research and report of a run.
+
+    Args:
+        research_brief: Brief written by the scoping phase
+        result: Dict with notes, raw_notes, sources, final_report and report_with_source_ids
+    """
+    with _connect() as connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO runs (brief, stored_at, result) VALUES (?, ?, ?)",
+            (normalize_brief(research_brief), time.time(), json.dumps(result)),
+        )
+    connection.close()
@@ -18,4 +18,25 @@ class ClarifyUserRequest(BaseModel):
 class WriteResearchBrief(BaseModel):
     research_brief: str = Field(
         description="A research brief that will be used to guide the research. It should be well detailed"
-    )
\ No newline at end of file
+    )
+
+
+class ScopeResearchRequest(BaseModel):
+    need_clarification: bool = Field(
+        description="Whether the user needs clarification on the request. True if the user needs clarification, False otherwise."
+    )
+    question: str = Field(
+        description="A question to ask the user to help clarify the report scope. Empty if no clarification is needed."
+    )
+    verification: str = Field(
+        description="A verification message that research will start. Empty if clarification is needed."
+    )
+    research_brief: str = Field(
+        description="A detailed research brief that will be used to guide the research. Empty if clarification is needed."
+    )
+
+
+class FollowUpIntent(BaseModel):
+    is_revision: bool = Field(
+        description="True only if the message asks to change the delivered report itself (length, format, wording, structure, or adding/removing content in it). False for any new question or new research request."
+    )
@@ -0,0 +1,122 @@
+import re
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in",
+    "into", "is", "it", "its", "of", "on", "or", "that", "the", "their", "this",
+    "to", "what", "which", "who", "with", "about", "including", "research",
+    "investigate", "find", "identify", "analyze", "provide", "information",
+    "latest", "current", "recent", "vs", "versus", "do", "does", "why", "when",
+}
+
+MONTHS = {
+    "january": "jan", "february": "feb", "march": "mar", "april": "apr",
+    "june": "jun", "july": "jul", "august": "aug", "september": "sep",
+    "sept": "sep", "october": "oct", "november": "nov", "december": "dec",
+}
+
+
+def _normalize_token(token: str) -> str:
+    """Canonical form of a single word: month names shortened, ordinals and plurals stripped."""
+    token = MONTHS.get(token, token)
+    # 1st, 2nd, 3rd, 21st -> 1, 2, 3, 21
+    token = re.sub(r"^(\d+)(st|nd|rd|th)$", r"\1", token)
+    # Naive plural stemming: prices -> price, companies -> company
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into canonical content words, keeping repeats and order.
+
+    Casing, punctuation, stop words, month spellings, ordinals and plurals are normalized.
+
+    Args:
+        text: Any text
+
+    Returns:
+        List of normalized words
+    """
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return [_normalize_token(word) for word in words if word not in STOP_WORDS]
+
+
+def normalize_tokens(text: str) -> frozenset:
+    """
+    Reduce text to a set of canonical content words.
+
+    Word order and repeats are ignored on top of the normalization done by tokenize,
+    so "X market size 2025" and "2025 market sizes of X" normalize to the same set.
+
+    Args:
+        text: Query, topic or any other short text
+
+    Returns:
+        Set of normalized words
+    """
+    return frozenset(tokenize(text))
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    """Jaccard similarity between two token sets, 0.0 when both are empty."""
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def containment(a: frozenset, b: frozenset) -> float:
+    """Fraction of the tokens of a that also appear in b, 0.0 when a is empty."""
+    if not a:
+        return 0.0
+    return len(a & b) / len(a)
+
+
+def number_tokens(tokens: frozenset) -> frozenset:
+    """Tokens holding a figure (years, amounts, versions), which two texts must share to be the same request."""
+    return frozenset(token for token in tokens if any(char.isdigit() for char in token))
+
+
+# Capitalized only because they open a sentence or a list item, not names
+SENTENCE_START_WORDS = {
+    "include", "use", "focus", "compare", "cover", "look", "list", "summarize", "examine",
+    "explore", "consider", "describe", "explain", "gather", "assess", "evaluate", "review",
+    "determine", "prioritize", "note", "also", "then", "please", "these", "those", "make",
+    "ensure", "collect", "discuss", "search", "check", "give", "report", "highlight", "study",
+    "estimate", "outline", "prefer", "avoid", "specifically", "additionally", "particularly",
+    "especially", "if", "where", "any", "all", "each", "both", "other", "key", "main", "only",
+    "get", "show", "break", "be", "consult", "cite", "detail", "track", "map", "compile",
+}
+
+
+def entity_tokens(text: str) -> frozenset:
+    """
+    Normalized words of text that name something specific: capitalized words and figures.
+
+    A capitalized word opening a sentence or a list item only counts when it is not a stop word
+    or a common instruction word ("Include", "Focus on"), so paragraph-long research topics
+    differing only in their phrasing are not mistaken for different subjects. Topics that differ
+    in these words (Tesla vs BYD, 2024 vs 2025) are about different things, however many other
+    words they share.
+
+    Args:
+        text: Query, topic or any other short text
+
+    Returns:
+        Set of normalized words
+    """
+    entities = set()
+    for match in re.finditer(r"[A-Za-z0-9]+", text):
+        word = match.group()
+        if any(char.isdigit() for char in word):
+            entities.update(tokenize(word))
+            continue
+        if not word[0].isupper():
+            continue
+        sentence_start = not re.search(r"[A-Za-z0-9,)]\s*$", text[: match.start()])
+        if sentence_start and word.lower() in STOP_WORDS | SENTENCE_START_WORDS:
+            continue
+        entities.update(tokenize(word))
+    return frozenset(entities)
@@ -0,0 +1,69 @@
+import re
+import hashlib
+from typing import Dict, TypedDict
+
+
+class Source(TypedDict):
+    """
+    Entry of the run-wide source table.
+    """
+
+    url: str
+    title: str
+
+
+# Matches compact source ids such as S3f9a2c inside any citation bracket
+SOURCE_ID_PATTERN = re.compile(r"\bS[0-9a-f]{6}\b")
+
+
+def source_id(url: str) -> str:
+    """
+    Short stable id for a url.
+
+    The id only depends on the url, so every researcher assigns the same id to the same
+    source without coordinating.
+
+    Args:
+        url: Url of the source
+
+    Returns:
+        Id such as "S3f9a2c"
+    """
+    return "S" + hashlib.sha1(url.encode("utf-8")).hexdigest()[:6]
+
+
+def merge_sources(left: Dict[str, Source], right: Dict[str, Source]) -> Dict[str, Source]:
+    """Reducer merging source tables from parallel researchers."""
+    return {**(left or {}), **(right or {})}
+
+
+def expand_source_ids(report: str, sources: Dict[str, Source]) -> str:
+    """
+    Replace source ids in a report with sequential citation numbers and append the source list.
+
+    Ids are numbered in order of first appearance, so "[S3f9a2c, S0b1d4e]" becomes "[1, 2]".
+    Ids missing from the source table are left untouched.
+
+    Args:
+        report: Report citing sources by id
+        sources: Run-wide source table keyed by id
+
+    Returns:
+        The report with numbered citations followed by a "### Sources" section
+    """
+    numbers: Dict[str, int] = {}
+    for match in SOURCE_ID_PATTERN.finditer(report):
+        if match.group() in sources and match.group() not in numbers:
+            numbers[match.group()] = len(numbers) + 1
+
+    if not numbers:
+        return report
+
+    expanded = SOURCE_ID_PATTERN.sub(
+        lambda m: str(numbers[m.group()]) if m.group() in numbers else m.group(), report
+    )
+    source_list = "\n".join(
+        f"- [{number}] {sources[sid]['title']}: {sources[sid]['url']}"
+        for sid, number in numbers.items()
+    )
+    return f"{expanded.rstrip()}\n\n### Sources\n\n{source_list}\n"
@@ -1,13 +1,40 @@
 #State definitio
 from langgraph.graph.message import MessagesState
 from langchain_core.messages import BaseMessage
-from typing import Annotated, Sequence
+from typing import Annotated, Any, Callable, Sequence
 from langgraph.graph.message import add_messages
 import operator
+from src.blob_store import BlobRef
+from src.sources import Source, merge_sources
+
+
+def override(value: Any) -> dict:
+    """Update that replaces a resettable state key instead of adding to it."""
+    return {"type": "override", "value": value}
+
+
+def resettable(reducer: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+    """
+    Wrap an additive reducer so a node can replace the whole value with override().
+
+    Args:
+        reducer: Reducer used for regular updates
+
+    Returns:
+        Reducer that also accepts override() updates
+    """
+
+    def reduce(current_value, new_value):
+        if isinstance(new_value, dict) and new_value.get("type") == "override":
+            return new_value["value"]
+        return reducer(current_value, new_value)
+
+    return reduce
 
 
 class InputState(MessagesState):
-    pass
+    #Set to True to research the request again even if an earlier run is cached
+    force_refresh: bool
 
 
 class AgentState(MessagesState):
@@ -16,8 +43,17 @@ class AgentState(MessagesState):
     research_brief: str
     supervisor_messages: Annotated[Sequence[BaseMessage], add_messages]
     #Processed and structured nodes ready for final report generation
-    notes: Annotated[list[str], operator.add] = []
-    #Raw notes collected from the sub agents
-    raw_noted: Annotated[list[str], operator.add] = []
+    #notes, raw_notes and sources are reset at the start of each research turn, so they only hold that turn's research
+    notes: Annotated[list[str], resettable(operator.add)] = []
+    #References to the raw notes collected from the sub agents, content lives in the blob store
+    raw_notes: Annotated[list[BlobRef], resettable(operator.add)] = []
+    #Run-wide source table keyed by compact source id, expanded into citations in the final report
+    sources: Annotated[dict[str, Source], resettable(merge_sources)] = {}
     # Final formatted research report
-    final_report: str
\ No newline at end of file
+    final_report: str
+    # Final report still citing compact source ids, used to revise the report on follow-ups
+    report_with_source_ids: str
+    #Set to True to research the request again even if an earlier run is cached
+    force_refresh: bool
+    #Whether the research of this run was served from the run cache
+    run_cache_hit: bool
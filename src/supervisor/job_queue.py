@@ -0,0 +1,252 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+from typing import Dict, Optional, Tuple
+
+# Queue shared by the supervisor and the research workers
+# Keep it on a local disk and run the workers on the same machine, WAL mode does not work on network filesystems
+JOB_QUEUE_DB = os.getenv("JOB_QUEUE_DB", ".cache/research_jobs.sqlite")
+
+# A running job not finished after this long is assumed lost with its worker and queued again
+JOB_LEASE_SECONDS = 30 * 60
+
+# Jobs are given up after this many attempts
+JOB_MAX_ATTEMPTS = 2
+
+# How often the supervisor checks for finished jobs
+JOB_POLL_INTERVAL_SECONDS = 1.0
+
+# The supervisor gives up on a job not finished after this long
+JOB_WAIT_TIMEOUT_SECONDS = JOB_LEASE_SECONDS * JOB_MAX_ATTEMPTS
+
+# Workers report themselves this often, and count as stopped when not seen for three times as long
+JOB_WORKER_HEARTBEAT_SECONDS = 10
+JOB_WORKER_STALE_SECONDS = 3 * JOB_WORKER_HEARTBEAT_SECONDS
+
+# A job still queued after this long while no worker is running is given up right away
+JOB_CLAIM_TIMEOUT_SECONDS = 60
+
+
+class ResearchJobError(Exception):
+    """Raised when a research job fails or is given up."""
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the job queue, creating the table on first use."""
+    os.makedirs(os.path.dirname(JOB_QUEUE_DB) or ".", exist_ok=True)
+    connection = sqlite3.connect(JOB_QUEUE_DB, timeout=30, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS jobs ("
+        "id TEXT PRIMARY KEY, research_topic TEXT, status TEXT, attempts INTEGER DEFAULT 0, "
+        "worker TEXT, result TEXT, error TEXT, created_at REAL, started_at REAL, finished_at REAL)"
+    )
+    connection.execute("CREATE TABLE IF NOT EXISTS workers (name TEXT PRIMARY KEY, last_seen REAL)")
+    return connection
+
+
+def record_worker(worker: str) -> None:
+    """
+    Report a worker as running, called by the worker every JOB_WORKER_HEARTBEAT_SECONDS.
+
+    Args:
+        worker: Name of the worker
+    """
+    connection = _connect()
+    connection.execute(
+        "INSERT INTO workers (name, last_seen) VALUES (?, ?) "
+        "ON CONFLICT(name) DO UPDATE SET last_seen = excluded.last_seen",
+        (worker, time.time()),
+    )
+    connection.close()
+
+
+def _has_running_worker() -> bool:
+    """Whether any worker reported itself within JOB_WORKER_STALE_SECONDS."""
+    connection = _connect()
+    row = connection.execute(
+        "SELECT 1 FROM workers WHERE last_seen >= ? LIMIT 1",
+        (time.time() - JOB_WORKER_STALE_SECONDS,),
+    ).fetchone()
+    connection.close()
+    return row is not None
+
+
+def submit_job(research_topic: str) -> str:
+    """
+    Queue a research unit.
+
+    Args:
+        research_topic: Topic of the ConductResearch call
+
+    Returns:
+        Id of the queued job
+    """
+    job_id = uuid.uuid4().hex
+    connection = _connect()
+    connection.execute(
+        "INSERT INTO jobs (id, research_topic, status, created_at) VALUES (?, ?, 'queued', ?)",
+        (job_id, research_topic, time.time()),
+    )
+    connection.close()
+    return job_id
+
+
+def claim_job(worker: str) -> Optional[Tuple[str, str]]:
+    """
+    Take the oldest queued job, or a job whose worker lease expired.
+
+    The claim runs in an immediate transaction so two workers never get the same job.
+
+    Args:
+        worker: Name of the claiming worker
+
+    Returns:
+        Tuple of the job id and research topic, or None when the queue is empty
+    """
+    now = time.time()
+    connection = _connect()
+    try:
+        connection.execute("BEGIN IMMEDIATE")
+        # Jobs of lost workers are queued again until they run out of attempts
+        connection.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+            "error = 'worker lease expired' WHERE status = 'running' AND started_at < ?",
+            (JOB_MAX_ATTEMPTS, now - JOB_LEASE_SECONDS),
+        )
+        row = connection.execute(
+            "SELECT id, research_topic FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+        ).fetchone()
+        if row is not None:
+            connection.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (worker, now, row[0]),
+            )
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+    finally:
+        connection.close()
+    return row
+
+
+def complete_job(job_id: str, result: Dict) -> None:
+    """
+    Store the result of a research unit.
+
+    Args:
+        job_id: Id of the job
+        result: Dict with compressed_research, raw_notes and sources
+    """
+    connection = _connect()
+    connection.execute(
+        "UPDATE jobs SET status = 'done', result = ?, finished_at = ? WHERE id = ?",
+        (json.dumps(result), time.time(), job_id),
+    )
+    connection.close()
+
+
+def fail_job(job_id: str, error: str) -> None:
+    """
+    Mark a research unit as failed.
+
+    Args:
+        job_id: Id of the job
+        error: Error message shown to the supervisor
+    """
+    connection = _connect()
+    connection.execute(
+        "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+        (error, time.time(), job_id),
+    )
+    connection.close()
+
+
+def abandon_job(job_id: str, error: str) -> None:
+    """
+    Give up on a job that is still queued or running, so no worker picks it up later.
+
+    Args:
+        job_id: Id of the job
+        error: Reason the job was given up
+    """
+    connection = _connect()
+    connection.execute(
+        "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+        "WHERE id = ? AND status IN ('queued', 'running')",
+        (error, time.time(), job_id),
+    )
+    connection.close()
+
+
+def _job_status(job_id: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """Status, result and error of a job."""
+    connection = _connect()
+    row = connection.execute(
+        "SELECT status, result, error FROM jobs WHERE id = ?", (job_id,)
+    ).fetchone()
+    connection.close()
+    if row is None:
+        raise ResearchJobError(f"Unknown research job {job_id}")
+    return row
+
+
+async def wait_for_job(job_id: str) -> Dict:
+    """
+    Wait until a worker finishes a research unit.
+
+    Polls the queue without blocking the event loop, so the supervisor can wait for
+    several jobs at once. A job nobody claimed within JOB_CLAIM_TIMEOUT_SECONDS is given
+    up as soon as no worker is running, instead of waiting for JOB_WAIT_TIMEOUT_SECONDS.
+
+    Args:
+        job_id: Id of the job
+
+    Returns:
+        Dict with compressed_research, raw_notes and sources
+
+    Raises:
+        ResearchJobError: If the job failed, was not picked up by a worker or did not finish
+            within JOB_WAIT_TIMEOUT_SECONDS
+    """
+    claim_deadline = time.monotonic() + JOB_CLAIM_TIMEOUT_SECONDS
+    deadline = time.monotonic() + JOB_WAIT_TIMEOUT_SECONDS
+    while True:
+        status, result, error = await asyncio.to_thread(_job_status, job_id)
+        if status == "done":
+            return json.loads(result)
+        if status == "failed":
+            raise ResearchJobError(f"Research job {job_id} failed: {error}")
+        if (
+            status == "queued"
+            and time.monotonic() >= claim_deadline
+            and not await asyncio.to_thread(_has_running_worker)
+        ):
+            error = f"not picked up after {JOB_CLAIM_TIMEOUT_SECONDS:.0f}s, no worker is running"
+            await asyncio.to_thread(abandon_job, job_id, error)
+            raise ResearchJobError(f"Research job {job_id} {error}")
+        if time.monotonic() >= deadline:
+            error = f"not finished after {JOB_WAIT_TIMEOUT_SECONDS:.0f}s"
+            await asyncio.to_thread(abandon_job, job_id, error)
+            raise ResearchJobError(f"Research job {job_id} {error}")
+        await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+
+
+async def run_queued_research(research_topic: str) -> Dict:
+    """
+    Run a research unit on a worker process through the job queue.
+
+    Args:
+        research_topic: Topic of the ConductResearch call
+
+    Returns:
+        Dict with compressed_research, raw_notes and sources
+    """
+    job_id = await asyncio.to_thread(submit_job, research_topic)
+    print(f"Queued research job {job_id}")
+    return await wait_for_job(job_id)
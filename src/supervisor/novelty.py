@@ -0,0 +1,70 @@
+from typing import Dict, Iterable, List
+
+from src.similarity import tokenize
+from src.sources import SOURCE_ID_PATTERN
+
+# Length of the word n-grams compared between a round's findings and the accumulated notes
+NOVELTY_NGRAM_SIZE = 3
+
+# Weight of new sources relative to new n-grams in the round novelty score
+NOVELTY_SOURCE_WEIGHT = 0.5
+
+
+def ngrams(text: str, size: int = NOVELTY_NGRAM_SIZE) -> set:
+    """
+    Set of normalized word n-grams of a text.
+
+    Source ids are dropped first so that citing a known fact from a new source does not
+    count as new content.
+
+    Args:
+        text: Findings text
+        size: Number of words per n-gram
+
+    Returns:
+        Set of n-gram tuples
+    """
+    words = tokenize(SOURCE_ID_PATTERN.sub(" ", text))
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def measure_novelty(
+    findings: List[str],
+    known_notes: Iterable[str],
+    round_sources: Iterable[str],
+    known_sources: Iterable[str],
+) -> Dict[str, float]:
+    """
+    Measure how much a research round added to what was already known.
+
+    Runs locally without any model call. The score is a weighted mean of the fraction of the
+    round's n-grams missing from the accumulated notes and the fraction of its sources that
+    were not cited before.
+
+    Args:
+        findings: Compressed findings returned by the researchers of the round
+        known_notes: Findings accumulated in earlier rounds
+        round_sources: Source ids cited by the round
+        known_sources: Source ids cited in earlier rounds
+
+    Returns:
+        Dict with the novelty score, new_ngram_ratio, new_sources and total_sources
+    """
+    round_ngrams = set().union(*(ngrams(text) for text in findings)) if findings else set()
+    known_ngrams = set().union(*(ngrams(text) for text in known_notes))
+    round_sources, known_sources = set(round_sources), set(known_sources)
+
+    new_ngram_ratio = (
+        len(round_ngrams - known_ngrams) / len(round_ngrams) if round_ngrams else 0.0
+    )
+    new_sources = len(round_sources - known_sources)
+    # A round that cites no source can only add novelty through its text
+    new_source_ratio = new_sources / len(round_sources) if round_sources else new_ngram_ratio
+
+    return {
+        "novelty": (1 - NOVELTY_SOURCE_WEIGHT) * new_ngram_ratio
+        + NOVELTY_SOURCE_WEIGHT * new_source_ratio,
+        "new_ngram_ratio": new_ngram_ratio,
+        "new_sources": new_sources,
+        "total_sources": len(round_sources),
+    }
@@ -13,7 +13,7 @@ You have access to three main tools:
 2. **ResearchComplete**: Indicate that research is complete
 3. **think_tool**: For reflection and strategic planning during research
 
-**CRITICAL: Use think_tool before calling ConductResearch to plan your approach, and after each ConductResearch to assess progress**
+{reflection_instructions}
 **PARALLEL RESEARCH**: When you identify multiple independent sub-topics that can be explored simultaneously, make multiple ConductResearch tool calls in a single response to enable parallel research execution. This is more efficient than sequential research for comparative or multi-faceted questions. Use at most {max_concurrent_research_units} parallel agents per iteration.
 </Available Tools>
 
@@ -56,4 +56,19 @@ After each ConductResearch tool call, use think_tool to analyze the results:
 - A separate agent will write the final report - you just need to gather information
 - When calling ConductResearch, provide complete standalone instructions - sub-agents can't see other agents' work
 - Do NOT use acronyms or abbreviations in your research questions, be very clear and specific
-</Scaling Rules>"""
\ No newline at end of file
+</Scaling Rules>"""
+
+RESEARCH_NOVELTY_PROMPT = """
+
+<Research Novelty>
+How much each ConductResearch round added to the findings you already had, from first to latest round:
+{rounds}
+A low score means the round mostly repeated earlier findings and sources. When the latest rounds add little, prefer calling ResearchComplete over delegating more research on the same topics.
+Research stops automatically once a round scores below {threshold:.0%}.
+</Research Novelty>"""
+
+
+SUPERVISOR_REFLECTION_SEPARATE_INSTRUCTIONS = "**CRITICAL: Use think_tool before calling ConductResearch to plan your approach, and after each ConductResearch to assess progress**"
+
+SUPERVISOR_REFLECTION_INLINE_INSTRUCTIONS = """**CRITICAL: Use think_tool before calling ConductResearch to plan your approach, and after each ConductResearch to assess progress**
+**Reflect in the same turn as you act**: Call think_tool together with your ConductResearch or ResearchComplete calls in a single response (parallel tool calls), not in a response of its own."""
@@ -0,0 +1,83 @@
+import os
+import re
+import json
+import time
+import sqlite3
+from typing import Dict, Optional
+
+from src.metrics import increment
+# How long a research result can be reused, within a run and across runs
+RESEARCH_MEMO_TTL_SECONDS = 24 * 3600
+
+RESEARCH_MEMO_DB = os.getenv("RESEARCH_MEMO_DB", ".cache/research_memo.sqlite")
+
+
+def topic_key(research_topic: str) -> str:
+    """
+    Key under which a research topic is memoized: its words lowercased and sorted.
+
+    Only casing, whitespace, punctuation and word order are ignored. Topics differing in any word,
+    such as the company or the year, never share a research result.
+    """
+    return " ".join(sorted(re.findall(r"\w+", research_topic.lower())))
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the research memo, creating the table on first use."""
+    os.makedirs(os.path.dirname(RESEARCH_MEMO_DB) or ".", exist_ok=True)
+    connection = sqlite3.connect(RESEARCH_MEMO_DB, timeout=30)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS research ("
+        "topic TEXT PRIMARY KEY, stored_at REAL, result TEXT)"
+    )
+    return connection
+
+
+def find_research(research_topic: str) -> Optional[Dict]:
+    """
+    Find a fresh research result for the same topic, up to casing, whitespace and word order.
+
+    Args:
+        research_topic: Topic of a ConductResearch call
+
+    Returns:
+        Dict with compressed_research, raw_notes and sources, or None when no fresh topic matches
+    """
+    min_stored_at = time.time() - RESEARCH_MEMO_TTL_SECONDS
+    with _connect() as connection:
+        row = connection.execute(
+            "SELECT result FROM research WHERE topic = ? AND stored_at >= ?",
+            (topic_key(research_topic), min_stored_at),
+        ).fetchone()
+    connection.close()
+
+    if row is None:
+        increment("research_memo.misses")
+        return None
+
+    increment("research_memo.hits")
+    print(f"Reusing research result for topic '{research_topic[:80]}'")
+    return json.loads(row[0])
+
+
+def store_research(research_topic: str, result: Dict) -> None:
+    """
+    Remember the outcome of a research unit.
+
+    Raw notes are stored as blob references, their content stays in the blob store.
+
+    Args:
+        research_topic: Topic of the ConductResearch call
+        result: Output of the research agent
+    """
+    memo = {
+        "compressed_research": result["compressed_research"],
+        "raw_notes": result.get("raw_notes", []),
+        "sources": result.get("sources", {}),
+    }
+    with _connect() as connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO research (topic, stored_at, result) VALUES (?, ?, ?)",
+            (topic_key(research_topic), time.time(), json.dumps(memo)),
+        )
+    connection.close()
@@ -4,6 +4,9 @@ import operator
 from langchain_core.messages import BaseMessage
 from langgraph.graph.message import add_messages
 
+from src.blob_store import BlobRef
+from src.sources import Source, merge_sources
+
 
 class SupervisorState(TypedDict):
     #This will hold the messages exchanges with the supervisor for coordination and decision making
@@ -14,5 +17,13 @@ class SupervisorState(TypedDict):
     research_iterations: int = 0
     #Processed and structured nodes ready for final report generation
     notes: Annotated[list[str], operator.add] = []
-    #Raw notes collected from the sub agents
-    raw_noted: Annotated[list[str], operator.add] = []
\ No newline at end of file
+    #References to the raw notes collected from the sub agents, content lives in the blob store
+    raw_notes: Annotated[list[BlobRef], operator.add] = []
+    #Run-wide source table keyed by compact source id, shared by every researcher
+    sources: Annotated[dict[str, Source], merge_sources] = {}
+    #Share of new findings and sources added by each ConductResearch round, in order
+    research_novelty: Annotated[list[float], operator.add] = []
+    #Set by the request to run fresh research instead of reusing memoized research units
+    force_refresh: bool = False
+    #Reflections made in the same turn as ConductResearch, recorded without a think_tool round trip
+    reflections: Annotated[list[str], operator.add] = []
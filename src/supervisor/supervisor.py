@@ -5,24 +5,43 @@ from langchain_core.messages import (
     ToolMessage,
     HumanMessage,
 )
+import os
 import asyncio
 from typing import Literal
 from src.supervisor.tools import ConductResearch, ResearchComplete
 from langchain.chat_models import init_chat_model
 from src.supervisor.state import SupervisorState
 from langgraph.types import Command
-from src.supervisor.prompt import SUPERVISOR_PROMPT
+from src.supervisor.prompt import (
+    SUPERVISOR_PROMPT,
+    RESEARCH_NOVELTY_PROMPT,
+    SUPERVISOR_REFLECTION_INLINE_INSTRUCTIONS,
+    SUPERVISOR_REFLECTION_SEPARATE_INSTRUCTIONS,
+)
 from src.utils import get_today_str
+from src.llm import resilient
 from langgraph.graph import StateGraph, END, START
-from src.research_agent.tools.think.think import think_tool
+from src.research_agent.tools.think.think import (
+    think_tool,
+    INLINE_REFLECTION,
+    split_inline_reflections,
+)
 from src.research_agent.agent import research_agent
-from src.supervisor.utils import get_notes_from_tool_calls
+from src.supervisor.utils import get_notes_from_tool_calls, is_research_note
+from src.supervisor.novelty import measure_novelty
+from src.supervisor.research_memo import find_research, store_research
+from src.supervisor.job_queue import run_queued_research
+from src.supervisor.topic_overlap import merge_overlapping_topics
+from src.metrics import increment
+from src.research_agent.tools.tavily.prefetch import prefetch_search
 
 
 # Configuration
 supervisor_tools = [ConductResearch, ResearchComplete, think_tool]
 supervisor_model = init_chat_model(model="openai:gpt-4.1")
-supervisor_model_with_tools = supervisor_model.bind_tools(supervisor_tools)
+supervisor_model_with_tools = resilient(
+    supervisor_model.bind_tools(supervisor_tools), name="supervisor", timeout=180
+)
 
 # Maximum number of tool call iterations for individual research agents
 # This is to prevent infinite loops and controls research depth per topic
@@ -32,6 +51,58 @@ MAX_RESEARCH_ITERATIONS = 6
 # This is passed to the supervisor prompt to control the number of concurrent research agents
 MAX_CONCURRENT_RESEARCH_AGENTS = 3
 
+# Start searches derived from each research topic as soon as a research agent is launched
+# These run in parallel with the researcher's first model call and are served from cache on a match
+PREFETCH_SEARCH_ON_LAUNCH = False
+
+# Stop researching once a round adds less than this share of new findings and sources
+# The novelty of each round is also shown to the supervisor so it can stop earlier on its own
+NOVELTY_EARLY_STOP = True
+NOVELTY_STOP_THRESHOLD = 0.15
+
+# Reuse the result of a recent research unit on the same or a nearly identical topic
+# A ConductResearch call with bypass_cache set always runs fresh research
+RESEARCH_MEMO_ENABLED = True
+
+# Where research agents run: "local" runs them in this process, "queue" submits them to the
+# SQLite job queue served by worker processes (python -m src.supervisor.worker)
+RESEARCH_BACKEND = os.getenv("RESEARCH_BACKEND", "local")
+
+# A failing research unit is retried on its own this many times, the other units of the round are kept
+# Queued units are retried as new jobs, the job queue itself only requeues jobs of lost workers
+RESEARCH_UNIT_MAX_RETRIES = 1
+
+
+async def run_research_unit(research_topic: str) -> dict:
+    """
+    Run a single research unit on the configured backend, retrying it when it fails.
+
+    Args:
+        research_topic: Topic of the research unit
+
+    Returns:
+        Result of the research agent with compressed_research, raw_notes and sources
+
+    Raises:
+        Exception: The error of the last attempt once the retries are exhausted
+    """
+    for attempt in range(RESEARCH_UNIT_MAX_RETRIES + 1):
+        try:
+            if RESEARCH_BACKEND == "queue":
+                return await run_queued_research(research_topic)
+            return await research_agent.ainvoke(
+                {
+                    "researcher_messages": [HumanMessage(content=research_topic)],
+                    "research_brief": research_topic,
+                }
+            )
+        except Exception as e:
+            increment("supervisor.unit_failures")
+            if attempt == RESEARCH_UNIT_MAX_RETRIES:
+                raise
+            print(f"Research unit failed ({type(e).__name__}: {e}), retrying: {research_topic[:80]}")
+            increment("supervisor.unit_retries")
+
 
 async def supervisor(state: SupervisorState) -> Command[Literal["supervisor_tools"]]:
     """
@@ -56,8 +127,22 @@ async def supervisor(state: SupervisorState) -> Command[Literal["supervisor_tool
         date=get_today_str(),
         max_concurrent_research_units=MAX_CONCURRENT_RESEARCH_AGENTS,
         max_researcher_iterations=MAX_RESEARCH_ITERATIONS,
+        reflection_instructions=(
+            SUPERVISOR_REFLECTION_INLINE_INSTRUCTIONS
+            if INLINE_REFLECTION
+            else SUPERVISOR_REFLECTION_SEPARATE_INSTRUCTIONS
+        ),
     )
 
+    research_novelty = state.get("research_novelty", [])
+    if research_novelty:
+        system_instruction += RESEARCH_NOVELTY_PROMPT.format(
+            rounds="\n".join(
+                f"- Round {i}: {score:.0%} new" for i, score in enumerate(research_novelty, 1)
+            ),
+            threshold=NOVELTY_STOP_THRESHOLD,
+        )
+
     messages = [SystemMessage(content=system_instruction)] + supervisor_messages
 
     # make the decision about the next research steps
@@ -99,6 +184,9 @@ async def supervisor_tools(
     # Initialize variables for single return pattern
     tool_messages = []
     all_raw_notes = []
+    all_sources = {}
+    round_novelty = []
+    reflections = []
     next_node = "supervisor"
     should_stop = False
 
@@ -119,16 +207,22 @@ async def supervisor_tools(
     else:
         # Excute all the tool call before deciding the next step
         try:
+            # Reflections made alongside ConductResearch are recorded without running think_tool
+            reflection_messages, reflections, tool_calls = split_inline_reflections(
+                most_recent_message.tool_calls
+            )
+            tool_messages.extend(reflection_messages)
+
             # Separate think tool calls from ConductResearch tool calls
             think_tool_calls = [
                 tool_call
-                for tool_call in most_recent_message.tool_calls
+                for tool_call in tool_calls
                 if tool_call["name"] == "think_tool"
             ]
 
             conduct_research_calls = [
                 tool_call
-                for tool_call in most_recent_message.tool_calls
+                for tool_call in tool_calls
                 if tool_call["name"] == "ConductResearch"
             ]
 
@@ -145,22 +239,64 @@ async def supervisor_tools(
 
             # Handle ConductResearch tool calls
             if conduct_research_calls:
-                # Launch parallel research agents
-                coros = [
-                    research_agent.ainvoke(
-                        {
-                            "researcher_messages": [
-                                HumanMessage(
-                                    content=tool_call["args"]["research_topic"]
-                                )
-                            ],
-                            "research_brief": tool_call["args"]["research_topic"],
-                        }
-                    ) for tool_call in conduct_research_calls
+                # Overlapping topics are researched once, by a unit covering all of them
+                research_units, merged_calls = merge_overlapping_topics(conduct_research_calls)
+
+                # Serve topics researched recently from the memo, only the rest is launched
+                cached_results = {}
+                if RESEARCH_MEMO_ENABLED and not state.get("force_refresh"):
+                    for tool_call in research_units:
+                        if not tool_call["args"].get("bypass_cache"):
+                            cached = await asyncio.to_thread(
+                                find_research, tool_call["args"]["research_topic"]
+                            )
+                            if cached is not None:
+                                cached_results[tool_call["id"]] = cached
+
+                launch_calls = [
+                    tool_call
+                    for tool_call in research_units
+                    if tool_call["id"] not in cached_results
                 ]
 
-                # Waite for all the research to complete
-                tool_results = await asyncio.gather(*coros)
+                # Speculatively start the searches the researchers are likely to ask for first
+                if RESEARCH_BACKEND != "queue" and PREFETCH_SEARCH_ON_LAUNCH:
+                    for tool_call in launch_calls:
+                        prefetch_search(tool_call["args"]["research_topic"])
+
+                # Launch parallel research agents and wait for all of them
+                # A unit that still fails after its retries doesn't discard the others
+                launched_results = await asyncio.gather(
+                    *(
+                        run_research_unit(tool_call["args"]["research_topic"])
+                        for tool_call in launch_calls
+                    ),
+                    return_exceptions=True,
+                )
+                failed_units = {
+                    tool_call["id"]: result
+                    for result, tool_call in zip(launched_results, launch_calls)
+                    if isinstance(result, BaseException)
+                }
+                if failed_units:
+                    print(f"{len(failed_units)} of {len(launch_calls)} research units failed")
+
+                if RESEARCH_MEMO_ENABLED:
+                    for result, tool_call in zip(launched_results, launch_calls):
+                        if tool_call["id"] not in failed_units and result.get("compressed_research"):
+                            await asyncio.to_thread(
+                                store_research, tool_call["args"]["research_topic"], result
+                            )
+
+                # Put the results back in the order of the tool calls
+                launched_by_id = {
+                    tool_call["id"]: {} if tool_call["id"] in failed_units else result
+                    for result, tool_call in zip(launched_results, launch_calls)
+                }
+                tool_results = [
+                    cached_results.get(tool_call["id"]) or launched_by_id[tool_call["id"]]
+                    for tool_call in research_units
+                ]
 
                 # Format the research results as tool messages
                 # Each sub agent returns compressed research finding in result['compressed_research']
@@ -174,28 +310,103 @@ async def supervisor_tools(
                         tool_call_id=tool_call["id"],
                         name=tool_call["name"],
                     )
-                    for result, tool_call in zip(tool_results, conduct_research_calls)
+                    for result, tool_call in zip(tool_results, research_units)
+                    if tool_call["id"] not in failed_units
                 ]
 
                 tool_messages.extend(research_tool_messages)
 
-                # Aggregate the research findings from the research agents
+                # Failed units are answered with their error so the supervisor can relaunch them
+                tool_messages.extend(
+                    ToolMessage(
+                        content=(
+                            f"Research on this topic failed: {type(error).__name__}: {error}. "
+                            "No findings were gathered, launch it again if the topic is still needed."
+                        ),
+                        tool_call_id=tool_call_id,
+                        name="ConductResearch",
+                        status="error",
+                    )
+                    for tool_call_id, error in failed_units.items()
+                )
+
+                # Every merged call still gets an answer, pointing at the unit that covered it
+                # The artifact marks the pointer so it is not taken for findings in the notes
+                tool_messages.extend(
+                    ToolMessage(
+                        content=(
+                            f"This topic overlapped with research unit {unit['id']} launched in "
+                            "the same turn and was merged into it, its findings are in that "
+                            "unit's result."
+                        ),
+                        tool_call_id=tool_call["id"],
+                        name=tool_call["name"],
+                        artifact={"merged_into": unit["id"]},
+                    )
+                    for tool_call, unit in merged_calls
+                )
+
+                # Aggregate the raw note references from the research agents
+                # Only blob ids and sizes travel through state, the content stays in the blob store
                 all_raw_notes = [
-                    "\n\n".join(result.get("raw_notes", [])) for result in tool_results
+                    ref for result in tool_results for ref in result.get("raw_notes", [])
                 ]
 
+                # Merge the sources cited by each researcher into the run-wide source table
+                for result in tool_results:
+                    all_sources.update(result.get("sources", {}))
+
+                # Compare this round with the findings and sources of earlier rounds
+                # A round where every unit failed found nothing, but that is no reason to stop
+                novelty = None
+                if research_tool_messages:
+                    novelty = measure_novelty(
+                        findings=[str(m.content) for m in research_tool_messages],
+                        known_notes=[
+                            str(m.content)
+                            for m in filter_messages(supervisor_messages, include_types="tool")
+                            if m.name == "ConductResearch" and is_research_note(m)
+                        ],
+                        round_sources=all_sources,
+                        known_sources=state.get("sources", {}),
+                    )
+                    round_novelty = [novelty["novelty"]]
+                    print(
+                        f"Research round novelty: {novelty['novelty']:.0%} "
+                        f"({novelty['new_ngram_ratio']:.0%} new content, "
+                        f"{novelty['new_sources']}/{novelty['total_sources']} new sources)"
+                    )
+
+                # The first round has nothing to repeat, later rounds stop once they add too little
+                if (
+                    novelty
+                    and NOVELTY_EARLY_STOP
+                    and state.get("research_novelty")
+                    and novelty["novelty"] < NOVELTY_STOP_THRESHOLD
+                ):
+                    print("Stopping research: the last round added too little new information")
+                    increment("supervisor.novelty_stops")
+                    should_stop = True
+                    next_node = END
+
         except Exception as e:
             print(f"Error executing tool calls: {e}")
             should_stop = True
             next_node = END
 
     # Single return point with appropriate state updates
+    # A round stopped for low novelty still hands its findings over with the earlier ones
     if should_stop:
         return Command(
             goto=next_node,
             update={
-                "notes": get_notes_from_tool_calls(supervisor_messages),
+                "notes": get_notes_from_tool_calls(supervisor_messages + tool_messages),
                 "research_brief": state.get("research_brief", ""),
+                "supervisor_messages": tool_messages,
+                "raw_notes": all_raw_notes,
+                "sources": all_sources,
+                "research_novelty": round_novelty,
+                "reflections": reflections,
             },
         )
     else:
@@ -204,6 +415,9 @@ async def supervisor_tools(
             update={
                 "supervisor_messages": tool_messages,
                 "raw_notes": all_raw_notes,
+                "sources": all_sources,
+                "research_novelty": round_novelty,
+                "reflections": reflections,
             },
         )
 
@@ -7,6 +7,7 @@ class ConductResearch(BaseModel):
     Tool for delegating a research task to a specialized research agent.
     """
     research_topic: str = Field(description="TThe topic to research. Should be a single topic, and should be described in high detail (at least a paragraph).")
+    bypass_cache: bool = Field(default=False, description="Set to true to run fresh research even if the same topic was researched recently, e.g. when up-to-date information is required.")
 
 
 @tool
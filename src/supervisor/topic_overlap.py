@@ -0,0 +1,82 @@
+from typing import List, Tuple
+
+from langchain_core.messages import ToolCall
+
+from src.metrics import increment
+from src.similarity import normalize_tokens, entity_tokens
+
+# ConductResearch topics sharing at least this share of the words of the shorter topic are merged
+# Topics whose differing words include a name or a figure (Tesla vs BYD, 2024 vs 2025) are never merged
+TOPIC_MERGE_THRESHOLD = 0.7
+
+
+def topic_overlap(a: frozenset, b: frozenset) -> float:
+    """Overlap coefficient of two token sets: shared words over the size of the smaller set."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+
+def distinct_subjects(a: frozenset, b: frozenset, entities: frozenset) -> bool:
+    """Whether the words differing between two token sets include a name or a figure."""
+    return bool((a ^ b) & entities)
+
+
+def merge_overlapping_topics(
+    tool_calls: List[ToolCall],
+) -> Tuple[List[ToolCall], List[Tuple[ToolCall, ToolCall]]]:
+    """
+    Merge parallel ConductResearch calls whose topics overlap into single research units.
+
+    Runs locally without any model call. Each call is compared with the units formed so far and
+    joins the first one it overlaps with; the unit's topic is extended with the merged topic so
+    a single researcher covers both without running the same searches twice. Comparative fan-outs
+    that only differ in the subject (one topic per company, country or year) stay separate.
+
+    Args:
+        tool_calls: ConductResearch tool calls of a supervisor turn
+
+    Returns:
+        Tuple of the research units to launch, as tool calls carrying the merged topics, and
+        pairs of each merged call with the unit tool call it was merged into
+    """
+    units: List[ToolCall] = []
+    unit_tokens: List[frozenset] = []
+    unit_entities: List[frozenset] = []
+    merged: List[Tuple[ToolCall, ToolCall]] = []
+
+    for tool_call in tool_calls:
+        tokens = normalize_tokens(tool_call["args"]["research_topic"])
+        entities = entity_tokens(tool_call["args"]["research_topic"])
+        for i, existing in enumerate(unit_tokens):
+            if distinct_subjects(tokens, existing, entities | unit_entities[i]):
+                continue
+            if topic_overlap(tokens, existing) >= TOPIC_MERGE_THRESHOLD:
+                unit = units[i]
+                topic = (
+                    f"{unit['args']['research_topic']}\n\n"
+                    f"Also cover: {tool_call['args']['research_topic']}"
+                )
+                bypass_cache = bool(
+                    unit["args"].get("bypass_cache") or tool_call["args"].get("bypass_cache")
+                )
+                units[i] = {
+                    **unit,
+                    "args": {**unit["args"], "research_topic": topic, "bypass_cache": bypass_cache},
+                }
+                unit_tokens[i] = existing | tokens
+                unit_entities[i] = unit_entities[i] | entities
+                merged.append((tool_call, units[i]))
+                break
+        else:
+            units.append(tool_call)
+            unit_tokens.append(tokens)
+            unit_entities.append(entities)
+
+    if merged:
+        increment("supervisor.units_merged", len(merged))
+        print(f"Merged {len(merged)} overlapping research units into {len(units)} units")
+
+    # Pair merged calls with the final version of their unit
+    units_by_id = {unit["id"]: unit for unit in units}
+    return units, [(call, units_by_id[unit["id"]]) for call, unit in merged]
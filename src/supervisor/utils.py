@@ -1,4 +1,10 @@
-from langchain_core.messages import BaseMessage, filter_messages
+from langchain_core.messages import BaseMessage, ToolMessage, filter_messages
+
+
+def is_research_note(tool_msg: ToolMessage) -> bool:
+    """Whether a tool message holds findings, not a failed research unit or a merged-topic pointer."""
+    merged = isinstance(tool_msg.artifact, dict) and "merged_into" in tool_msg.artifact
+    return tool_msg.status != "error" and not merged
 
 
 def get_notes_from_tool_calls(messages: list[BaseMessage]) -> list[str]:
@@ -13,8 +19,13 @@ def get_notes_from_tool_calls(messages: list[BaseMessage]) -> list[str]:
         messages: List of messages from the supervisor's conversation history
     
     Returns:
-        List of research note string extracted from ToolMessage objects
+        List of research note string extracted from ToolMessage objects, failed research units
+        and pointers of merged topics excluded
     """
     
-    return [tool_msg.content for tool_msg in filter_messages(messages, include_types="tool")]
+    return [
+        tool_msg.content
+        for tool_msg in filter_messages(messages, include_types="tool")
+        if is_research_note(tool_msg)
+    ]
     
\ No newline at end of file
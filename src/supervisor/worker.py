@@ -0,0 +1,108 @@
+"""
+Research worker processes for the queue execution backend.
+
+Run on the same machine as the server, the SQLite queue needs a local disk:
+
+    python -m src.supervisor.worker --processes 4
+"""
+import os
+import time
+import socket
+import asyncio
+import argparse
+import multiprocessing
+from langchain_core.messages import HumanMessage
+from src.research_agent.agent import research_agent
+from src.supervisor.job_queue import (
+    claim_job,
+    complete_job,
+    fail_job,
+    record_worker,
+    JOB_WORKER_HEARTBEAT_SECONDS,
+)
+
+# How long an idle worker waits before checking the queue again
+WORKER_IDLE_SECONDS = 1.0
+
+
+async def run_worker(worker: str, max_concurrent_jobs: int) -> None:
+    """
+    Claim research jobs from the queue and run them until the process is stopped.
+
+    Args:
+        worker: Name of the worker, stored with each claimed job
+        max_concurrent_jobs: Number of research agents run at once by this process
+    """
+    print(f"Research worker {worker} started")
+
+    async def run_job(job_id: str, research_topic: str):
+        try:
+            result = await research_agent.ainvoke(
+                {
+                    "researcher_messages": [HumanMessage(content=research_topic)],
+                    "research_brief": research_topic,
+                }
+            )
+            await asyncio.to_thread(
+                complete_job,
+                job_id,
+                {
+                    "compressed_research": result.get(
+                        "compressed_research", "Error synthesizing research report"
+                    ),
+                    "raw_notes": result.get("raw_notes", []),
+                    "sources": result.get("sources", {}),
+                },
+            )
+            print(f"Research job {job_id} completed")
+        except Exception as e:
+            print(f"Research job {job_id} failed: {e}")
+            await asyncio.to_thread(fail_job, job_id, str(e))
+
+    running = set()
+    last_heartbeat = 0.0
+    while True:
+        # Let supervisors know a worker is running, so queued jobs are not given up
+        if time.monotonic() - last_heartbeat >= JOB_WORKER_HEARTBEAT_SECONDS:
+            await asyncio.to_thread(record_worker, worker)
+            last_heartbeat = time.monotonic()
+
+        claimed = None
+        if len(running) < max_concurrent_jobs:
+            claimed = await asyncio.to_thread(claim_job, worker)
+
+        if claimed is None:
+            # Nothing to do or no free slot, wait for the queue or for a job to finish
+            if running:
+                _, running = await asyncio.wait(running, timeout=WORKER_IDLE_SECONDS)
+            else:
+                await asyncio.sleep(WORKER_IDLE_SECONDS)
+            continue
+
+        running.add(asyncio.create_task(run_job(*claimed)))
+
+
+def worker_process(index: int, max_concurrent_jobs: int) -> None:
+    """Entry point of a single worker process."""
+    worker = f"{socket.gethostname()}-{os.getpid()}-{index}"
+    asyncio.run(run_worker(worker, max_concurrent_jobs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run research workers for the job queue")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=3, help="Research agents per process")
+    args = parser.parse_args()
+
+    processes = [
+        multiprocessing.Process(target=worker_process, args=(i, args.concurrency))
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()